@@ -0,0 +1,179 @@
+"""
+Offline benchmark: main.py ko local fakes ke saath chalata hai
+(shrutibots, Telegram, YouTube metadata aur Mongo sab local).
+
+    python bench/bench_api.py --requests 500 --concurrency 50
+"""
+import os
+import sys
+import time
+import asyncio
+import argparse
+import tempfile
+import datetime
+import statistics
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+os.environ.setdefault("BOT_TOKEN", "123456:BENCH")
+os.environ.setdefault("API_ID", "1")
+os.environ.setdefault("API_HASH", "bench")
+
+import aiohttp
+import uvicorn
+from aiohttp import web
+from fakes import FakeCollection, FakeBotClient, FakeMetadataPool, make_upstream_app
+
+main = None
+
+BENCH_KEY = "SUD-bench"
+
+def percentile(values, p):
+    if not values: return 0.0
+    values = sorted(values)
+    idx = min(len(values) - 1, int(round(p / 100 * (len(values) - 1))))
+    return values[idx]
+
+def report(name, latencies, errors, wall):
+    ok = len(latencies)
+    print(
+        f"{name:<12} {ok:>6} {errors:>6} {ok / wall if wall else 0:>10.1f} "
+        f"{percentile(latencies, 50) * 1000:>9.1f} {percentile(latencies, 95) * 1000:>9.1f} "
+        f"{percentile(latencies, 99) * 1000:>9.1f} {statistics.mean(latencies) * 1000 if latencies else 0:>9.1f}"
+    )
+
+async def drive(session, urls, concurrency, expect):
+    latencies, errors = [], 0
+    queue = asyncio.Queue()
+    for u in urls: queue.put_nowait(u)
+
+    async def worker():
+        nonlocal errors
+        while not queue.empty():
+            url = queue.get_nowait()
+            t0 = time.perf_counter()
+            try:
+                async with session.get(url, allow_redirects=False) as resp:
+                    body = await resp.read()
+                    ok = resp.status == expect and (resp.content_type != "application/json" or b'"status":200' in body)
+            except Exception:
+                ok = False
+            if ok: latencies.append(time.perf_counter() - t0)
+            else: errors += 1
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies, errors, time.perf_counter() - t0
+
+async def wait_ready(base: str, timeout: float = 60):
+    # FAST_START warm-up (pyrogram/yt_dlp import, pool spawn) khatam hone do, warna pehla scenario skew hoga
+    deadline = time.monotonic() + timeout
+    async with aiohttp.ClientSession() as session:
+        while time.monotonic() < deadline:
+            async with session.get(f"{base}/ready") as resp:
+                if resp.status == 200: return
+            await asyncio.sleep(0.05)
+    print(f"⚠️ /ready nahi aaya {timeout:.0f}s me, phir bhi bench chala rahe hain")
+
+def install_fakes(args, upstream_url):
+    ms = args.upstream_ms / 1000
+    if args.bot_rate: main.BOT_RATE = args.bot_rate
+    args.bot_rate = main.BOT_RATE
+    # Proxy on (stream-proxy scenario); redirect wala scenario ?proxy=0 bhejta hai
+    main.STREAM_PROXY = True
+    main.disk_cache.root = tempfile.mkdtemp(prefix="bench_stream_")
+    main.EXTERNAL_API_URL = upstream_url
+    main.TELEGRAM_API_URL = upstream_url
+    main.BASE_URL = "http://bench"
+
+    main.keys_col = FakeCollection(args.mongo_ms / 1000)
+    main.videos_col = FakeCollection(args.mongo_ms / 1000)
+    main.queries_col = FakeCollection(args.mongo_ms / 1000)
+    main.leases_col = FakeCollection(args.mongo_ms / 1000)
+    main.upload_requests_col = FakeCollection(args.mongo_ms / 1000)
+    main.jobs_col = FakeCollection(args.mongo_ms / 1000)
+    main.track_hits_col = FakeCollection(args.mongo_ms / 1000)
+    main.usage_col = FakeCollection(args.mongo_ms / 1000)
+    main.invalidations_col = FakeCollection(args.mongo_ms / 1000)
+    main.metadata_pool = FakeMetadataPool(args.metadata_ms / 1000)
+    for b in main.bot_pool.bots:
+        b.client = FakeBotClient(ms)
+
+    main.keys_col.docs.append({
+        "user_id": 1, "api_key": BENCH_KEY, "daily_limit": 10 ** 9, "used_today": 0,
+        "total_usage": 0, "last_reset": str(datetime.date.today()), "active": True,
+        "expires_at": int(time.time()) + 86400
+    })
+    # Cache-hit path ke liye pehle se uploaded tracks
+    for i in range(args.hot_tracks):
+        main.videos_col.docs.append({
+            "yt_id": f"hot{i:08d}", "title": f"Hot {i}", "duration": "3:00", "thumbnail": None,
+            "audio_file_id": f"HOT_A_{i}", "video_file_id": f"HOT_V_{i}"
+        })
+
+async def run(args):
+    global main
+    os.environ["BOT_TOKENS"] = ",".join(f"{100000 + i}:BENCH" for i in range(args.bots))
+    import main
+    upstream = web.AppRunner(make_upstream_app(args.payload_kb * 1024, args.upstream_ms / 1000))
+    await upstream.setup()
+    site = web.TCPSite(upstream, "127.0.0.1", args.upstream_port)
+    await site.start()
+    upstream_url = f"http://127.0.0.1:{args.upstream_port}"
+
+    install_fakes(args, upstream_url)
+
+    server = uvicorn.Server(uvicorn.Config(main.app, host="127.0.0.1", port=args.port, log_level="warning"))
+    server_task = asyncio.create_task(server.serve())
+    while not server.started: await asyncio.sleep(0.05)
+
+    base = f"http://127.0.0.1:{args.port}"
+    await wait_ready(base)
+    n, hot = args.requests, args.hot_tracks
+    run_id = int(time.time()) % 100000
+    scenarios = [
+        ("audio-hit", [f"{base}/getaudio?query=hot{i % hot:08d}&key={BENCH_KEY}" for i in range(n)], 200),
+        ("video-hit", [f"{base}/getvideo?query=hot{i % hot:08d}&key={BENCH_KEY}" for i in range(n)], 200),
+        ("audio-miss", [f"{base}/getaudio?query=m{run_id:05d}a{i:04d}&key={BENCH_KEY}" for i in range(n)], 200),
+        ("video-miss", [f"{base}/getvideo?query=m{run_id:05d}v{i:04d}&key={BENCH_KEY}" for i in range(n)], 200),
+        ("stream", [f"{base}/stream/hot{i % hot:08d}?type=audio&proxy=0" for i in range(n)], 307),
+        ("stream-proxy", [f"{base}/stream/hot{i % hot:08d}?type=audio" for i in range(n)], 200),
+        ("stats", [f"{base}/stats?key={BENCH_KEY}" for _ in range(n)], 200),
+    ]
+
+    print(
+        f"requests={n} concurrency={args.concurrency} payload={args.payload_kb}KB "
+        f"upstream={args.upstream_ms}ms mongo={args.mongo_ms}ms bots={args.bots}x{args.bot_rate}/s"
+    )
+    print(f"{'scenario':<12} {'ok':>6} {'errors':>6} {'req/s':>10} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'mean ms':>9}")
+    connector = aiohttp.TCPConnector(limit=args.concurrency)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        for name, urls, expect in scenarios:
+            if args.only and name not in args.only: continue
+            latencies, errors, wall = await drive(session, urls, args.concurrency, expect)
+            report(name, latencies, errors, wall)
+
+    server.should_exit = True
+    await server_task
+    await upstream.cleanup()
+
+def parse_args():
+    p = argparse.ArgumentParser(description="Offline benchmark for main.py")
+    p.add_argument("--requests", type=int, default=200)
+    p.add_argument("--concurrency", type=int, default=20)
+    p.add_argument("--hot-tracks", type=int, default=50)
+    p.add_argument("--payload-kb", type=int, default=512)
+    p.add_argument("--upstream-ms", type=float, default=20)
+    p.add_argument("--metadata-ms", type=float, default=50)
+    p.add_argument("--mongo-ms", type=float, default=1)
+    p.add_argument("--bots", type=int, default=1, help="fake Telegram bots in the upload pool")
+    p.add_argument("--bot-rate", type=float, default=None, help="per-bot upload sends/sec (default: main.py BOT_RATE)")
+    p.add_argument("--port", type=int, default=18000)
+    p.add_argument("--upstream-port", type=int, default=18001)
+    p.add_argument("--only", nargs="*", help="sirf ye scenarios (audio-hit, video-hit, audio-miss, video-miss, stream, stream-proxy, stats)")
+    return p.parse_args()
+
+if __name__ == "__main__":
+    asyncio.run(run(parse_args()))
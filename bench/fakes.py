@@ -0,0 +1,228 @@
+import io
+import asyncio
+from types import SimpleNamespace
+from aiohttp import web
+from pymongo.errors import DuplicateKeyError
+
+# ─────────────────────────────
+# MONGO STAND-IN (sirf wahi ops jo main.py use karta hai)
+# ─────────────────────────────
+def _matches(doc, flt):
+    for k, v in flt.items():
+        if k == "$text":
+            words = set(v["$search"].lower().split())
+            if not words & set(str(doc.get("title", "")).lower().split()): return False
+        elif k == "$or":
+            if not any(_matches(doc, f) for f in v): return False
+        elif isinstance(v, dict) and "$in" in v:
+            if doc.get(k) not in v["$in"]: return False
+        elif isinstance(v, dict) and "$ne" in v:
+            if doc.get(k) == v["$ne"]: return False
+        elif isinstance(v, dict) and "$gt" in v:
+            if doc.get(k) is None or not doc.get(k) > v["$gt"]: return False
+        elif isinstance(v, dict) and "$lt" in v:
+            if doc.get(k) is None or not doc.get(k) < v["$lt"]: return False
+        elif doc.get(k) != v:
+            return False
+    return True
+
+def _apply(doc, update):
+    for k, v in update.get("$set", {}).items():
+        doc[k] = v
+    for k, v in update.get("$inc", {}).items():
+        doc[k] = doc.get(k, 0) + v
+    for k, v in update.get("$min", {}).items():
+        if doc.get(k) is None or v < doc[k]: doc[k] = v
+
+def _project(doc, projection):
+    if not projection: return dict(doc)
+    keep = {k for k, v in projection.items() if v}
+    if projection.get("_id", 1): keep.add("_id")
+    return {k: v for k, v in doc.items() if k in keep}
+
+class FakeCursor:
+    def __init__(self, docs):
+        self.docs = docs
+
+    def sort(self, *args, **kwargs):
+        return self
+
+    def limit(self, n):
+        self.docs = self.docs[:n]
+        return self
+
+    def __aiter__(self):
+        self._it = iter(self.docs)
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self._it)
+        except StopIteration:
+            raise StopAsyncIteration
+
+    async def to_list(self, length=None):
+        return self.docs[:length] if length else list(self.docs)
+
+class FakeCollection:
+    def __init__(self, latency: float = 0.0):
+        self.docs = []
+        self.latency = latency  # network round trip simulate karne ke liye
+
+    async def _rtt(self):
+        if self.latency: await asyncio.sleep(self.latency)
+
+    async def create_index(self, *args, **kwargs):
+        await self._rtt()
+        return "fake_index"
+
+    async def insert_one(self, doc):
+        await self._rtt()
+        self.docs.append(dict(doc))
+
+    async def find_one(self, flt, projection=None):
+        await self._rtt()
+        for d in self.docs:
+            if _matches(d, flt): return _project(d, projection)
+        return None
+
+    def find(self, flt, projection=None):
+        return FakeCursor([_project(d, projection) for d in self.docs if _matches(d, flt)])
+
+    def _update(self, flt, update, upsert=False, many=False):
+        hits = [d for d in self.docs if _matches(d, flt)]
+        if not hits and upsert:
+            doc = {k: v for k, v in flt.items() if not k.startswith("$") and not isinstance(v, dict)}
+            # Real Mongo jaisa: same _id pe upsert -> duplicate key
+            if "_id" in doc and any(d.get("_id") == doc["_id"] for d in self.docs):
+                raise DuplicateKeyError("E11000 duplicate key")
+            self.docs.append(doc)
+            hits = [doc]
+        for d in (hits if many else hits[:1]):
+            _apply(d, update)
+        return SimpleNamespace(matched_count=len(hits), modified_count=len(hits))
+
+    async def update_one(self, flt, update, upsert=False):
+        await self._rtt()
+        return self._update(flt, update, upsert)
+
+    async def update_many(self, flt, update, upsert=False):
+        await self._rtt()
+        return self._update(flt, update, upsert, many=True)
+
+    async def find_one_and_update(self, flt, update, upsert=False, **kwargs):
+        await self._rtt()
+        before = next((dict(d) for d in self.docs if _matches(d, flt)), None)
+        self._update(flt, update, upsert)
+        return before
+
+    async def find_one_and_delete(self, flt, sort=None):
+        await self._rtt()
+        hits = [d for d in self.docs if _matches(d, flt)]
+        for k, direction in (sort or [])[::-1]:
+            hits.sort(key=lambda d: d.get(k), reverse=direction < 0)
+        if not hits: return None
+        self.docs.remove(hits[0])
+        return hits[0]
+
+    async def delete_one(self, flt):
+        await self._rtt()
+        for d in self.docs:
+            if _matches(d, flt):
+                self.docs.remove(d)
+                return SimpleNamespace(deleted_count=1)
+        return SimpleNamespace(deleted_count=0)
+
+    async def bulk_write(self, ops, ordered=True):
+        await self._rtt()
+        for op in ops:
+            # pymongo UpdateOne ke private fields
+            self._update(op._filter, op._doc, getattr(op, "_upsert", False))
+
+# ─────────────────────────────
+# TELEGRAM UPLOADER STAND-IN
+# ─────────────────────────────
+class FakeBotClient:
+    def __init__(self, upload_latency: float = 0.0, login_latency: float = 0.0):
+        self.upload_latency = upload_latency
+        self.login_latency = login_latency  # Telegram login/handshake simulate
+        self.uploads = 0
+
+    async def start(self):
+        if self.login_latency: await asyncio.sleep(self.login_latency)
+
+    async def stop(self): pass
+
+    async def get_me(self):
+        return SimpleNamespace(first_name="Bench", username="bench_bot")
+
+    async def _send(self, file):
+        # Real upload ki tarah poora file padho
+        if isinstance(file, io.IOBase):
+            file.read()
+        else:
+            with open(file, "rb") as f: f.read()
+        await asyncio.sleep(self.upload_latency)
+        self.uploads += 1
+        return f"FAKE_FILE_{self.uploads}"
+
+    async def send_audio(self, chat_id, audio, **kwargs):
+        return SimpleNamespace(audio=SimpleNamespace(file_id=await self._send(audio)))
+
+    async def send_video(self, chat_id, video, **kwargs):
+        return SimpleNamespace(video=SimpleNamespace(file_id=await self._send(video)))
+
+# ─────────────────────────────
+# METADATA STAND-IN
+# ─────────────────────────────
+class FakeMetadataPool:
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+
+    def start(self): pass
+    def stop(self): pass
+    async def prime(self): return 0
+
+    async def extract(self, query: str):
+        await asyncio.sleep(self.latency)
+        vid = (query.strip().replace(" ", "_") + "___________")[:11]
+        return vid, f"Bench {query}", "3:30", f"https://i.ytimg.com/vi/{vid}/hqdefault.jpg"
+
+# ─────────────────────────────
+# UPSTREAM HTTP STUB (shrutibots + Telegram Bot API)
+# ─────────────────────────────
+def make_upstream_app(payload_bytes: int, latency: float = 0.0):
+    payload = b"\0" * payload_bytes
+    app = web.Application()
+
+    async def download_token(request):
+        await asyncio.sleep(latency)
+        return web.json_response({"download_token": "bench-token"})
+
+    async def stream(request):
+        await asyncio.sleep(latency)
+        return web.Response(body=payload, content_type="application/octet-stream")
+
+    async def get_file(request):
+        await asyncio.sleep(latency)
+        return web.json_response({"ok": True, "result": {"file_path": f"music/{request.query['file_id']}.mp3"}})
+
+    async def file_download(request):
+        # Telegram file server: Range support ke saath
+        await asyncio.sleep(latency)
+        rng = request.headers.get("Range")
+        if rng and rng.startswith("bytes="):
+            start_s, _, end_s = rng[6:].partition("-")
+            start = int(start_s or 0)
+            end = int(end_s) if end_s else len(payload) - 1
+            return web.Response(
+                status=206, body=payload[start:end + 1],
+                headers={"Content-Range": f"bytes {start}-{end}/{len(payload)}"}
+            )
+        return web.Response(body=payload, content_type="application/octet-stream")
+
+    app.router.add_get("/download", download_token)
+    app.router.add_get("/file/bot{token}/{path:.+}", file_download)
+    app.router.add_get("/stream/{video_id}", stream)
+    app.router.add_get("/bot{token}/getFile", get_file)
+    return app
@@ -0,0 +1,135 @@
+"""
+Index report: main.py ki hot queries ka explain plan dikhata hai
+(IXSCAN vs COLLSCAN, keys/docs examined).
+
+    MONGO_DB_URI=mongodb://... python bench/index_report.py
+    python bench/index_report.py --uri mongodb://localhost --seed 1000000
+
+Live DB pe sirf read-only kaam: explain + main.index_specs() se compare
+karke batata hai kaunse indexes missing hain (kuch create nahi karta).
+--seed ek alag scratch DB me synthetic docs + indexes daalta hai, taaki
+millions docs par bhi plan check ho sake.
+"""
+import os
+import sys
+import argparse
+import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+os.environ.setdefault("BOT_TOKEN", "123456:REPORT")
+
+from pymongo import MongoClient, InsertOne
+
+SCRATCH_DB = "MusicAPI_IndexReport"
+
+def plan_stages(plan):
+    stages = []
+    while plan:
+        stages.append(plan.get("stage"))
+        plan = plan.get("inputStage") or (plan.get("inputStages") or [None])[0]
+    return stages
+
+def explain(col, flt, projection):
+    out = col.find(flt, projection).explain()
+    stats = out.get("executionStats", {})
+    winning = out["queryPlanner"]["winningPlan"]
+    winning = winning.get("queryPlan", winning)  # SBE format
+    return plan_stages(winning), stats
+
+def seed(db, n):
+    print(f"🌱 Seeding {n} docs per collection into {db.name}...")
+    batch = 10000
+    for start in range(0, n, batch):
+        end = min(n, start + batch)
+        db["api_users"].bulk_write([InsertOne({
+            "user_id": i, "api_key": f"SUD-{i:016x}", "daily_limit": 50, "used_today": 0,
+            "total_usage": 0, "last_reset": "2026-01-01", "active": True, "expires_at": 0
+        }) for i in range(start, end)], ordered=False)
+        db["telegram_files_v2"].bulk_write([InsertOne({
+            "yt_id": f"{i:011d}", "title": f"Track {i}", "duration": "3:00", "thumbnail": None,
+            "audio_file_id": f"A{i}", "audio_bot_id": 1
+        }) for i in range(start, end)], ordered=False)
+
+def index_keys(field):
+    keys = [(field, 1)] if isinstance(field, str) else list(field)
+    return [(k, int(v) if isinstance(v, (int, float)) else v) for k, v in keys]
+
+def missing_indexes(db, specs):
+    # main.index_specs() vs DB me sach me bane indexes (ensure_indexes fail hua ho toh yahi pakdega)
+    problems = []
+    for name, field, opts in specs:
+        want = index_keys(field)
+        text = any(v == "text" for _, v in want)
+        found = None
+        for info in db[name].index_information().values():
+            have = index_keys(info["key"])
+            # Text index Mongo me _fts/_ftsx keys se store hota hai
+            if have == want or (text and have[0][0] == "_fts"):
+                found = info
+                break
+        if not found:
+            problems.append((name, field, "missing"))
+        elif opts.get("unique") and not found.get("unique"):
+            problems.append((name, field, "exists but not unique"))
+    return problems
+
+def main():
+    p = argparse.ArgumentParser(description="Explain plans for main.py hot queries")
+    p.add_argument("--uri", default=os.getenv("MONGO_DB_URI", "mongodb://localhost:27017"))
+    p.add_argument("--seed", type=int, default=0, help="scratch DB me itne synthetic docs")
+    args = p.parse_args()
+
+    import main as api  # projections/index specs yahin se, taaki drift na ho
+
+    client = MongoClient(args.uri)
+    db = client[SCRATCH_DB if args.seed else api.db.name]
+
+    if args.seed:
+        client.drop_database(SCRATCH_DB)
+        seed(db, args.seed)
+
+    specs = [(col.name, field, opts) for col, field, opts in api.index_specs()]
+    if args.seed:
+        # Sirf scratch DB me indexes banao; live DB read-only hai
+        for name, field, opts in specs:
+            db[name].create_index(field, **opts)
+
+    missing = missing_indexes(db, specs)
+    for name, field, problem in missing:
+        print(f"❌ {name}.{field}: {problem}")
+
+    keys, videos, queries, usage = db["api_users"], db["telegram_files_v2"], db["search_cache"], db["usage_hourly"]
+    sample_key = (keys.find_one({}, {"api_key": 1, "user_id": 1}) or {})
+    sample_ids = [d["yt_id"] for d in videos.find({}, {"yt_id": 1}).limit(50)]
+
+    hot = [
+        ("check_api_limit", keys, {"api_key": sample_key.get("api_key", "SUD-x")}, api.KEY_PROJECTION),
+        ("expiry sweep", keys, {"active": True, "expires_at": {"$lt": 0}}, {"_id": 1}),
+        ("bot /setlimit", keys, {"user_id": sample_key.get("user_id", 0)}, {"_id": 1}),
+        ("cache lookup", videos, {"yt_id": sample_ids[0] if sample_ids else "x"}, api.track_projection("audio")),
+        ("batch $in", videos, {"yt_id": {"$in": sample_ids or ["x"]}}, api.track_projection("audio")),
+        ("stream", videos, {"yt_id": sample_ids[0] if sample_ids else "x"}, {"_id": 0, "audio_file_id": 1, "audio_bot_id": 1}),
+        ("bot /usage", usage, {"user_id": sample_key.get("user_id", 0), "hour": {"$gte": datetime.datetime(2026, 1, 1)}}, {"_id": 0, "hour": 1, "requests": 1}),
+        ("search cache", queries, {"q": "tum hi ho"}, {"_id": 0, "yt_id": 1, "title": 1, "duration": 1, "thumbnail": 1}),
+    ]
+
+    print(f"DB: {db.name}  api_users={keys.estimated_document_count()}  videos={videos.estimated_document_count()}")
+    print(f"{'query':<16} {'plan':<28} {'keys':>6} {'docs':>6} {'ret':>5} {'ms':>5}")
+    bad = 0
+    for name, col, flt, proj in hot:
+        stages, stats = explain(col, flt, proj)
+        plan = " <- ".join(s for s in stages if s)
+        if "COLLSCAN" in stages: bad += 1
+        print(
+            f"{name:<16} {plan:<28} {stats.get('totalKeysExamined', 0):>6} "
+            f"{stats.get('totalDocsExamined', 0):>6} {stats.get('nReturned', 0):>5} {stats.get('executionTimeMillis', 0):>5}"
+        )
+
+    print("✅ All hot queries use indexes" if not bad else f"❌ {bad} hot queries do a COLLSCAN")
+    print("✅ All main.py indexes present" if not missing else f"❌ {len(missing)} main.py indexes missing/wrong")
+    sys.exit(1 if bad or missing else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""
+Cold start benchmark: main.py ko naye process me boot karta hai aur
+time-to-first-request / first cache hit / ready naapta hai,
+FAST_START=0 (purana blocking startup) vs FAST_START=1.
+
+    python bench/startup_bench.py --runs 3 --login-ms 3000 --mongo-ms 200
+
+Telegram login aur Mongo round trips fakes se simulate hote hain,
+isliye network ke bina bhi chalta hai.
+"""
+import os
+import sys
+import time
+import json
+import argparse
+import datetime
+import statistics
+import subprocess
+import urllib.request
+import urllib.error
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+BENCH_KEY = "SUD-bench"
+
+# ─────────────────────────────
+# CHILD (yahi process cold start hota hai)
+# ─────────────────────────────
+def child(args):
+    t0 = time.perf_counter()
+    sys.path.insert(0, ROOT)
+    sys.path.insert(0, HERE)
+    import main
+    import_s = time.perf_counter() - t0
+    print(json.dumps({"import_s": import_s}), flush=True)
+
+    from fakes import FakeCollection, FakeBotClient, FakeMetadataPool
+    ms = args.mongo_ms / 1000
+    for name in ("keys_col", "videos_col", "queries_col", "leases_col", "upload_requests_col", "jobs_col", "track_hits_col", "usage_col", "invalidations_col"):
+        setattr(main, name, FakeCollection(ms))
+    main.metadata_pool = FakeMetadataPool()
+    for b in main.bot_pool.bots:
+        b.client = FakeBotClient(login_latency=args.login_ms / 1000)
+    main.PREFETCH = False
+
+    main.keys_col.docs.append({
+        "user_id": 1, "api_key": BENCH_KEY, "daily_limit": 10 ** 9, "used_today": 0,
+        "total_usage": 0, "last_reset": str(datetime.date.today()), "active": True,
+        "expires_at": int(time.time()) + 86400
+    })
+    main.videos_col.docs.append({
+        "yt_id": "hot00000000", "title": "Hot", "duration": "3:00", "thumbnail": None,
+        "audio_file_id": "HOT_A", "video_file_id": "HOT_V"
+    })
+
+    import uvicorn
+    uvicorn.run(main.app, host="127.0.0.1", port=args.port, log_level="warning")
+
+# ─────────────────────────────
+# PARENT (bahar se poll karke naapta hai)
+# ─────────────────────────────
+def status_of(url):
+    try:
+        with urllib.request.urlopen(url, timeout=1) as resp:
+            return resp.status
+    except urllib.error.HTTPError as e:
+        return e.code
+    except Exception:
+        return None
+
+def wait_for(url, t0, deadline):
+    while time.perf_counter() < deadline:
+        if status_of(url) == 200: return time.perf_counter() - t0
+        time.sleep(0.005)
+    return None
+
+def one_run(args, fast: bool):
+    env = dict(os.environ)
+    env.update({
+        "FAST_START": "1" if fast else "0", "BOT_TOKENS": "123456:BENCH",
+        "BOT_TOKEN": "123456:BENCH", "API_ID": "1", "API_HASH": "bench", "METADATA_WORKERS": "0"
+    })
+    cmd = [
+        sys.executable, os.path.abspath(__file__), "--child", "--port", str(args.port),
+        "--login-ms", str(args.login_ms), "--mongo-ms", str(args.mongo_ms)
+    ]
+    base = f"http://127.0.0.1:{args.port}"
+
+    t0 = time.perf_counter()
+    proc = subprocess.Popen(cmd, env=env, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+    deadline = t0 + args.timeout
+    try:
+        first = wait_for(f"{base}/", t0, deadline)
+        hit = wait_for(f"{base}/getaudio?query=hot00000000&key={BENCH_KEY}", t0, deadline)
+        ready = wait_for(f"{base}/ready", t0, deadline)
+    finally:
+        proc.terminate()
+        out, _ = proc.communicate(timeout=10)
+
+    import_s = None
+    for line in out.splitlines():
+        if line.startswith("{"): import_s = json.loads(line).get("import_s")
+    return import_s, first, hit, ready
+
+def fmt(values):
+    values = [v for v in values if v is not None]
+    return f"{statistics.median(values) * 1000:>9.0f}" if values else f"{'timeout':>9}"
+
+def main():
+    p = argparse.ArgumentParser(description="Cold start benchmark for main.py")
+    p.add_argument("--runs", type=int, default=3)
+    p.add_argument("--login-ms", type=float, default=3000, help="simulated Telegram login per bot")
+    p.add_argument("--mongo-ms", type=float, default=100, help="simulated Mongo round trip")
+    p.add_argument("--port", type=int, default=18230)
+    p.add_argument("--timeout", type=float, default=60)
+    p.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = p.parse_args()
+
+    if args.child:
+        child(args)
+        return
+
+    print(f"runs={args.runs} login={args.login_ms:.0f}ms mongo_rtt={args.mongo_ms:.0f}ms (medians, ms from spawn)")
+    print(f"{'mode':<12} {'import':>9} {'first /':>9} {'first hit':>9} {'ready':>9}")
+    for fast in (False, True):
+        results = [one_run(args, fast) for _ in range(args.runs)]
+        cols = list(zip(*results))
+        print(f"{'FAST_START=' + ('1' if fast else '0'):<12} " + " ".join(fmt(c) for c in cols))
+
+if __name__ == "__main__":
+    main()
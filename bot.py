@@ -1,9 +1,12 @@
 import os
 import time
 import secrets
+import asyncio
 import datetime
+import aiohttp
 from pyrogram import Client, filters
 from pyrogram.types import Message
+from pymongo import UpdateOne
 from motor.motor_asyncio import AsyncIOMotorClient
 
 # ─────────────────────────────
@@ -14,6 +17,12 @@ API_HASH = os.getenv("API_HASH")
 BOT_TOKEN = os.getenv("BOT_TOKEN")
 
 MONGO_URL = os.getenv("MONGO_DB_URI")
+# API aur bot.py dono ek hi DB padhte/likhte hain (keys, usage_hourly, expired flag)
+MONGO_DB_NAME = os.getenv("MONGO_DB_NAME", "MusicAPI_DB120")
+
+# main.py ka key cache isi URL pe invalidate hota hai
+API_URL = os.getenv("API_URL", "https://yukiiapi.run.place")
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")
 
 ADMIN_ID = 6356015122
 ADMIN_CONTACT = "@Kaito_3_2"
@@ -25,8 +34,20 @@ DEFAULT_LIMIT = 50
 # DB
 # ─────────────────────────────
 mongo = AsyncIOMotorClient(MONGO_URL)
-db = mongo["MusicAPI_DB1"]
+db = mongo[MONGO_DB_NAME]
 keys_col = db["api_users"]
+usage_col = db["usage_hourly"]  # main.py har key ka hourly request count yahan likhta hai
+
+async def ensure_indexes():
+    for field in ("user_id", "api_key"):
+        try:
+            await keys_col.create_index(field, unique=True)
+        except Exception as e:
+            print(f"⚠️ Index error on api_users.{field}: {e}")
+    try:
+        await usage_col.create_index([("user_id", 1), ("hour", 1)])
+    except Exception as e:
+        print(f"⚠️ Index error on usage_hourly: {e}")
 
 # ─────────────────────────────
 # BOT
@@ -50,6 +71,28 @@ def now_ts():
 def days_to_ts(days: int):
     return now_ts() + days * 86400
 
+def parse_uids(arg: str):
+    # "123" ya bulk "123,456,789"
+    return list(dict.fromkeys(int(u) for u in arg.split(",") if u.strip()))
+
+def since_days(days: int):
+    return datetime.datetime.utcnow() - datetime.timedelta(days=days)
+
+async def invalidate_api_cache(*uids: int):
+    # Best effort: fail hua toh bhi API ka cache TTL ke baad refresh ho jayega
+    if not ADMIN_TOKEN: return
+    async with aiohttp.ClientSession() as session:
+        for uid in uids:
+            try:
+                await session.post(
+                    f"{API_URL}/admin/invalidate",
+                    params={"user_id": uid},
+                    headers={"X-Admin-Token": ADMIN_TOKEN},
+                    timeout=aiohttp.ClientTimeout(total=5)
+                )
+            except Exception as e:
+                print(f"⚠️ Cache invalidate failed for {uid}: {e}")
+
 # ─────────────────────────────
 # START
 # ─────────────────────────────
@@ -70,7 +113,10 @@ async def get_api(_, m: Message):
     user = m.from_user
     uid = user.id
 
-    doc = await keys_col.find_one({"user_id": uid})
+    doc = await keys_col.find_one(
+        {"user_id": uid},
+        {"_id": 0, "api_key": 1, "expires_at": 1, "daily_limit": 1}
+    )
 
     if doc:
         exp = datetime.datetime.fromtimestamp(doc["expires_at"])
@@ -111,9 +157,11 @@ async def get_api(_, m: Message):
 async def admin_panel(_, m: Message):
     await m.reply(
         "🛠 **Admin Panel**\n\n"
-        "/setlimit <user_id> <limit>\n"
-        "/extend <user_id> <days>\n"
-        "/disable <user_id>"
+        "/setlimit <user_id[,user_id...]> <limit>\n"
+        "/extend <user_id[,user_id...]> <days>\n"
+        "/disable <user_id>\n"
+        "/top [days] — most active users\n"
+        "/usage <user_id> [days] — daily history"
     )
 
 # ─────────────────────────────
@@ -122,19 +170,24 @@ async def admin_panel(_, m: Message):
 @app.on_message(filters.command("setlimit") & filters.user(ADMIN_ID))
 async def set_limit(_, m: Message):
     try:
-        _, uid, limit = m.text.split()
-        uid = int(uid)
+        _, uids, limit = m.text.split()
+        uids = parse_uids(uids)
         limit = int(limit)
 
-        await keys_col.update_one(
-            {"user_id": uid},
-            {"$set": {"daily_limit": limit}}
+        # Ek ya hazaar users, ek hi round trip
+        res = await keys_col.bulk_write(
+            [UpdateOne({"user_id": uid}, {"$set": {"daily_limit": limit}}) for uid in uids],
+            ordered=False
         )
+        await invalidate_api_cache(*uids)
 
-        await m.reply(f"✅ Limit updated for `{uid}` → `{limit}`")
+        if len(uids) == 1:
+            await m.reply(f"✅ Limit updated for `{uids[0]}` → `{limit}`")
+        else:
+            await m.reply(f"✅ Limit `{limit}` set for `{res.matched_count}/{len(uids)}` users")
 
     except:
-        await m.reply("❌ Usage: `/setlimit user_id limit`")
+        await m.reply("❌ Usage: `/setlimit user_id[,user_id...] limit`")
 
 # ─────────────────────────────
 # EXTEND
@@ -142,26 +195,32 @@ async def set_limit(_, m: Message):
 @app.on_message(filters.command("extend") & filters.user(ADMIN_ID))
 async def extend_key(_, m: Message):
     try:
-        _, uid, days = m.text.split()
-        uid = int(uid)
+        _, uids, days = m.text.split()
+        uids = parse_uids(uids)
         days = int(days)
 
-        doc = await keys_col.find_one({"user_id": uid})
-        if not doc:
+        # Read-modify-write ki jagah $inc, sab users ek bulk_write me
+        res = await keys_col.bulk_write(
+            [UpdateOne({"user_id": uid}, {"$inc": {"expires_at": days * 86400}}) for uid in uids],
+            ordered=False
+        )
+        if not res.matched_count:
             await m.reply("❌ User not found")
             return
-
-        new_exp = doc["expires_at"] + days * 86400
-
-        await keys_col.update_one(
-            {"user_id": uid},
-            {"$set": {"expires_at": new_exp}}
+        # API ke expiry sweep ne band kiya tha toh wapas on (/disable wale nahi)
+        await keys_col.update_many(
+            {"user_id": {"$in": uids}, "expired": True, "expires_at": {"$gt": now_ts()}},
+            {"$set": {"active": True}, "$unset": {"expired": ""}}
         )
+        await invalidate_api_cache(*uids)
 
-        await m.reply(f"✅ Extended `{uid}` by `{days}` days")
+        if len(uids) == 1:
+            await m.reply(f"✅ Extended `{uids[0]}` by `{days}` days")
+        else:
+            await m.reply(f"✅ Extended `{res.matched_count}/{len(uids)}` users by `{days}` days")
 
     except:
-        await m.reply("❌ Usage: `/extend user_id days`")
+        await m.reply("❌ Usage: `/extend user_id[,user_id...] days`")
 
 # ─────────────────────────────
 # DISABLE
@@ -176,13 +235,81 @@ async def disable_key(_, m: Message):
             {"user_id": uid},
             {"$set": {"active": False}}
         )
+        await invalidate_api_cache(uid)
 
         await m.reply(f"🚫 API key disabled for `{uid}`")
 
     except:
         await m.reply("❌ Usage: `/disable user_id`")
 
+# ─────────────────────────────
+# TOP USERS
+# ─────────────────────────────
+@app.on_message(filters.command("top") & filters.user(ADMIN_ID))
+async def top_users(_, m: Message):
+    try:
+        parts = m.text.split()
+        days = int(parts[1]) if len(parts) > 1 else 1
+
+        # Hourly buckets ka sum, Mongo me hi (lakhon keys pe bhi ek query)
+        rows = await usage_col.aggregate([
+            {"$match": {"hour": {"$gte": since_days(days)}}},
+            {"$group": {"_id": "$user_id", "requests": {"$sum": "$requests"}}},
+            {"$sort": {"requests": -1}},
+            {"$limit": 10},
+        ]).to_list(10)
+
+        if not rows:
+            await m.reply(f"📭 No usage in last `{days}` days")
+            return
+        lines = [f"{i}. `{r['_id']}` → `{r['requests']}`" for i, r in enumerate(rows, 1)]
+        await m.reply(f"🏆 **Top users ({days}d)**\n\n" + "\n".join(lines))
+
+    except:
+        await m.reply("❌ Usage: `/top [days]`")
+
+# ─────────────────────────────
+# USAGE HISTORY
+# ─────────────────────────────
+@app.on_message(filters.command("usage") & filters.user(ADMIN_ID))
+async def usage_history(_, m: Message):
+    try:
+        parts = m.text.split()
+        uid = int(parts[1])
+        days = int(parts[2]) if len(parts) > 2 else 7
+
+        doc = await keys_col.find_one(
+            {"user_id": uid},
+            {"_id": 0, "daily_limit": 1, "used_today": 1, "total_usage": 1, "expires_at": 1, "active": 1}
+        )
+        if not doc:
+            await m.reply("❌ User not found")
+            return
+
+        rows = await usage_col.aggregate([
+            {"$match": {"user_id": uid, "hour": {"$gte": since_days(days)}}},
+            {"$group": {
+                "_id": {"$dateToString": {"format": "%Y-%m-%d", "date": "$hour"}},
+                "requests": {"$sum": "$requests"}
+            }},
+            {"$sort": {"_id": 1}},
+        ]).to_list(None)
+
+        exp = datetime.datetime.fromtimestamp(doc.get("expires_at", 0))
+        lines = [f"`{r['_id']}` → `{r['requests']}`" for r in rows] or ["📭 No history"]
+        await m.reply(
+            f"📊 **Usage of `{uid}`**\n\n"
+            f"Active: `{doc.get('active', True)}` | Expires: `{exp}`\n"
+            f"Today: `{doc.get('used_today', 0)}/{doc.get('daily_limit', DEFAULT_LIMIT)}` | "
+            f"Total: `{doc.get('total_usage', 0)}`\n\n"
+            f"**Last {days} days (UTC)**\n" + "\n".join(lines)
+        )
+
+    except:
+        await m.reply("❌ Usage: `/usage user_id [days]`")
+
 # ─────────────────────────────
 # RUN
 # ─────────────────────────────
+asyncio.get_event_loop().run_until_complete(ensure_indexes())
 app.run()
@@ -3,25 +3,163 @@ import time
 import datetime
 import re
 import asyncio
+import io
+import json
 import uuid
+import socket
+import heapq
+import importlib
 import aiohttp
-from fastapi import FastAPI, HTTPException
-from fastapi.responses import RedirectResponse, JSONResponse
+from collections import OrderedDict
+from fastapi import FastAPI, HTTPException, Header, Body, Request
+from fastapi.responses import RedirectResponse, JSONResponse, StreamingResponse, Response
 from motor.motor_asyncio import AsyncIOMotorClient
-from pyrogram import Client
-import yt_dlp
+from pymongo import UpdateOne
+from pymongo.errors import DuplicateKeyError
+from prometheus_client import Counter, Gauge, Histogram, CollectorRegistry, multiprocess, generate_latest, CONTENT_TYPE_LATEST
+from ytpool import extract_video_id, MetadataPool, PoolBusy, PoolTimeout, DownloadPool, cancel_path
+from ytsearch import YouTubeSearch
+from streamcache import DiskCache, RangeFileResponse
+from config import YOUTUBE_API_KEYS
 
 # ─────────────────────────────
 # CONFIG
 # ─────────────────────────────
 MONGO_URL = os.getenv("MONGO_DB_URI")
+# API aur bot.py dono ek hi DB padhte/likhte hain (keys, usage_hourly, expired flag)
+MONGO_DB_NAME = os.getenv("MONGO_DB_NAME", "MusicAPI_DB120")
 BOT_TOKEN = os.getenv("BOT_TOKEN")
+# Multi-bot pool: comma separated tokens (pehla wala default/legacy bot)
+BOT_TOKENS = [t.strip() for t in os.getenv("BOT_TOKENS", BOT_TOKEN or "").split(",") if t.strip()]
 API_ID = os.getenv("API_ID")         
 API_HASH = os.getenv("API_HASH")     
 LOGGER_ID = int(os.getenv("LOGGER_ID", "-1003639584506")) 
 
 # ⚡ External Downloader Config
-EXTERNAL_API_URL = "https://shrutibots.site"
+EXTERNAL_API_URL = os.getenv("EXTERNAL_API_URL", "https://shrutibots.site")
+TELEGRAM_API_URL = os.getenv("TELEGRAM_API_URL", "https://api.telegram.org")
+
+# 🌐 Shared HTTP pool (shrutibots + Telegram)
+HTTP_POOL_LIMIT = int(os.getenv("HTTP_POOL_LIMIT", "100"))
+HTTP_POOL_PER_HOST = int(os.getenv("HTTP_POOL_PER_HOST", "20"))
+HTTP_KEEPALIVE = float(os.getenv("HTTP_KEEPALIVE", "60"))
+HTTP_DNS_TTL = int(os.getenv("HTTP_DNS_TTL", "300"))
+HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "10"))
+HTTP_TOKEN_TIMEOUT = float(os.getenv("HTTP_TOKEN_TIMEOUT", "20"))
+HTTP_DOWNLOAD_TIMEOUT = float(os.getenv("HTTP_DOWNLOAD_TIMEOUT", "1200"))
+HTTP_TELEGRAM_TIMEOUT = float(os.getenv("HTTP_TELEGRAM_TIMEOUT", "15"))
+
+# 💾 Download buffer: itne bytes tak RAM me, usse bada ho tabhi /tmp
+DOWNLOAD_CHUNK = int(os.getenv("DOWNLOAD_CHUNK", str(256 * 1024)))
+DOWNLOAD_SPOOL_MAX = int(os.getenv("DOWNLOAD_SPOOL_MAX", str(50 * 1024 * 1024)))
+
+# 🔁 Download retries / resume / stall detection / hedge
+DOWNLOAD_RETRIES = int(os.getenv("DOWNLOAD_RETRIES", "3"))
+DOWNLOAD_BACKOFF = float(os.getenv("DOWNLOAD_BACKOFF", "1"))
+DOWNLOAD_STALL_WINDOW = float(os.getenv("DOWNLOAD_STALL_WINDOW", "15"))
+DOWNLOAD_MIN_RATE = int(os.getenv("DOWNLOAD_MIN_RATE", str(32 * 1024)))  # bytes/sec
+HEDGE_TTFB = float(os.getenv("HEDGE_TTFB", "8"))  # 0 = hedge off
+LOCAL_DOWNLOAD = os.getenv("LOCAL_DOWNLOAD", "1") == "1"
+LOCAL_DOWNLOAD_WORKERS = int(os.getenv("LOCAL_DOWNLOAD_WORKERS", "2"))  # alag process pool (0 = thread mode)
+
+# 🎬 yt_dlp metadata process pool (0 = thread mode)
+METADATA_WORKERS = int(os.getenv("METADATA_WORKERS", "2"))
+METADATA_QUEUE = int(os.getenv("METADATA_QUEUE", "32"))
+METADATA_TIMEOUT = float(os.getenv("METADATA_TIMEOUT", "30"))
+METADATA_MAX_JOBS = int(os.getenv("METADATA_MAX_JOBS", "200"))
+
+# ▶️ YouTube Data API (YOUTUBE_API_KEYS config.py se); fail pe yt_dlp
+YT_KEY_DAILY_QUOTA = int(os.getenv("YT_KEY_DAILY_QUOTA", "10000"))
+YT_KEY_COOLDOWN = float(os.getenv("YT_KEY_COOLDOWN", "3600"))
+YT_API_TIMEOUT = float(os.getenv("YT_API_TIMEOUT", "5"))
+
+# 🔑 API Key Cache (seconds) + write-behind usage flush
+KEY_CACHE_TTL = int(os.getenv("KEY_CACHE_TTL", "60"))
+KEY_CACHE_MAX = int(os.getenv("KEY_CACHE_MAX", "10000"))
+USAGE_FLUSH_INTERVAL = int(os.getenv("USAGE_FLUSH_INTERVAL", "5"))
+USAGE_HISTORY_TTL = int(os.getenv("USAGE_HISTORY_TTL", str(90 * 86400)))  # hourly buckets kitne din rakhne
+
+# 🎧 Stream link cache (Telegram file links ~1 hour valid rehte hain)
+STREAM_CACHE_SIZE = int(os.getenv("STREAM_CACHE_SIZE", "5000"))
+STREAM_CACHE_TTL = int(os.getenv("STREAM_CACHE_TTL", "3000"))
+STREAM_NEGATIVE_TTL = int(os.getenv("STREAM_NEGATIVE_TTL", "30"))
+
+# 📡 Stream proxy mode (bytes khud serve, token hide, Range support) + hot-file disk cache
+STREAM_PROXY = os.getenv("STREAM_PROXY", "0") == "1"
+STREAM_DISK_DIR = os.getenv("STREAM_DISK_DIR", "/tmp/stream_cache")
+STREAM_DISK_MAX = int(os.getenv("STREAM_DISK_MAX", str(2 * 1024 * 1024 * 1024)))
+# uvicorn --workers (WEB_CONCURRENCY). Har worker alag process hai:
+# - key invalidation Mongo (key_invalidations) se saare workers tak pahunchti hai
+# - /metrics PROMETHEUS_MULTIPROC_DIR set ho toh saare workers ka sum (Procfile/Dockerfile set karte hain)
+# - disk cache directory sab share karte hain; STREAM_DISK_MAX poori directory ka budget
+# - per-worker hi rehte hain: stream/query/job caches, MISS_CONCURRENCY gate, metadata pool
+#   (cross-worker duplicate downloads leases rokte hain)
+PROMETHEUS_MULTIPROC_DIR = os.getenv("PROMETHEUS_MULTIPROC_DIR")
+
+# 🔎 Search query -> video_id cache (Mongo TTL + memory LRU)
+QUERY_CACHE_SIZE = int(os.getenv("QUERY_CACHE_SIZE", "20000"))
+QUERY_CACHE_TTL = int(os.getenv("QUERY_CACHE_TTL", str(7 * 86400)))
+
+# 📚 Local search tier (cached titles pe text index)
+LOCAL_SEARCH = os.getenv("LOCAL_SEARCH", "1") == "1"
+LOCAL_SEARCH_THRESHOLD = float(os.getenv("LOCAL_SEARCH_THRESHOLD", "0.9"))
+LOCAL_SEARCH_MIN_TOKENS = int(os.getenv("LOCAL_SEARCH_MIN_TOKENS", "2"))
+LOCAL_SEARCH_CANDIDATES = int(os.getenv("LOCAL_SEARCH_CANDIDATES", "5"))
+
+# 🧵 Async job mode (cache miss pe turant job id)
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "4"))
+JOB_QUEUE = int(os.getenv("JOB_QUEUE", "100"))
+JOB_TTL = int(os.getenv("JOB_TTL", "3600"))
+
+# 🧹 Maintenance loop (day boundary pe quota reset + har interval expiry sweep / temp cleanup)
+MAINTENANCE_INTERVAL = int(os.getenv("MAINTENANCE_INTERVAL", "300"))
+TEMP_MAX_AGE = int(os.getenv("TEMP_MAX_AGE", "7200"))  # isse purani /tmp download files orphan hain
+
+# 🔮 Popularity log + background prefetch (live traffic se kabhi compete nahi karega)
+PREFETCH = os.getenv("PREFETCH", "1") == "1"
+PREFETCH_RATE = float(os.getenv("PREFETCH_RATE", "0.2"))  # warm-ups/sec
+PREFETCH_QUEUE = int(os.getenv("PREFETCH_QUEUE", "1000"))
+PREFETCH_IDLE = float(os.getenv("PREFETCH_IDLE", "0.5"))  # miss slots ka itna hissa free ho tabhi
+PREFETCH_INTERVAL = int(os.getenv("PREFETCH_INTERVAL", "600"))
+PREFETCH_WINDOW = int(os.getenv("PREFETCH_WINDOW", "24"))  # hours
+PREFETCH_TOP = int(os.getenv("PREFETCH_TOP", "50"))
+PREFETCH_MIN_HITS = int(os.getenv("PREFETCH_MIN_HITS", "3"))
+PREFETCH_COMPANION = os.getenv("PREFETCH_COMPANION", "1") == "1"  # video miss -> audio bhi warm
+HIT_LOG_TTL = int(os.getenv("HIT_LOG_TTL", str(7 * 86400)))
+
+# 📦 Batch resolve (playlist queues)
+BATCH_MAX = int(os.getenv("BATCH_MAX", "100"))
+BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", "4"))
+
+# 🤖 Har bot ka upload budget (send_audio/send_video per sec, default 1/s).
+# getFile (stream links) pe ye budget nahi lagta; wahan sirf retry_after/FloodWait cooldown.
+# BOT_MAX_FLOOD_WAIT: itne seconds tak ka cooldown wait karenge, usse zyada pe 429 (getFile) / 503 (upload)
+BOT_RATE = float(os.getenv("BOT_RATE", "1"))
+BOT_MAX_FLOOD_WAIT = float(os.getenv("BOT_MAX_FLOOD_WAIT", "5"))
+
+# 🚦 Miss admission control (download+upload concurrency + wait queue)
+MISS_CONCURRENCY = int(os.getenv("MISS_CONCURRENCY", "8"))
+MISS_QUEUE = int(os.getenv("MISS_QUEUE", "32"))
+MISS_RETRY_AFTER = int(os.getenv("MISS_RETRY_AFTER", "5"))
+PREMIUM_LIMIT = 500  # /stats wala Premium tier (daily_limit > 500)
+
+# 🌍 Multi-worker / multi-node
+# NODE_ROLE: all (default) | api (upload nahi karega) | uploader
+NODE_ROLE = os.getenv("NODE_ROLE", "all")
+CAN_UPLOAD = NODE_ROLE in ("all", "uploader")
+NODE_ID = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+LEASE_TTL = int(os.getenv("LEASE_TTL", "60"))
+LEASE_POLL = float(os.getenv("LEASE_POLL", "0.5"))
+LEASE_POLL_MAX = float(os.getenv("LEASE_POLL_MAX", "5"))
+LEASE_WAIT_MAX = float(os.getenv("LEASE_WAIT_MAX", "1500"))
+# Uploader ka fail/busy result api nodes ko itni der dikhega (phir naya attempt)
+UPLOAD_FAIL_TTL = int(os.getenv("UPLOAD_FAIL_TTL", "30"))
+
+# ⚡ Fast cold start: port pehle khulega; Telegram login / indexes / yt_dlp background me
+FAST_START = os.getenv("FAST_START", "1") == "1"
+
+# 🛡️ bot.py admin commands isse cache invalidate karte hain
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")
 
 # 👇 Tera Render URL (Stream Redirect ke liye)
 BASE_URL = os.getenv("RENDER_EXTERNAL_URL", "https://yukiiapi.run.place")
@@ -31,143 +169,834 @@ app = FastAPI(title="⚡ Sudeep API (Final Edition)")
 # ─────────────────────────────
 # TELEGRAM CLIENT
 # ─────────────────────────────
-bot = Client(
-    "Sudeep_Session",
-    api_id=API_ID,
-    api_hash=API_HASH,
-    bot_token=BOT_TOKEN,
-    in_memory=True
-)
+class BotsFlooded(Exception):
+    # Saare bots BOT_MAX_FLOOD_WAIT se lambe FloodWait me: miss slot pakad ke mat baitho
+    def __init__(self, retry_after: float):
+        super().__init__(f"all bots flood-limited for {retry_after:.0f}s")
+        self.retry_after = retry_after
+
+class TelegramBot:
+    def __init__(self, token: str, index: int):
+        self.token = token
+        self.bot_id = int(token.split(":")[0])
+        self.index = index
+        self.client = None      # BotPool.start me banta hai (pyrogram import ~0.6s)
+        self.online = False     # login hua? (getFile ko sirf token chahiye, upload ko login)
+        self.next_slot = 0.0    # rate budget
+        self.flood_until = 0.0  # FloodWait cooldown
+
+    def new_client(self):
+        from pyrogram import Client
+        return Client(
+            "Sudeep_Session" if self.index == 0 else f"Sudeep_Session_{self.index}",
+            api_id=API_ID,
+            api_hash=API_HASH,
+            bot_token=self.token,
+            in_memory=True
+        )
+
+    def ready_at(self):
+        return max(self.next_slot, self.flood_until)
+
+    async def acquire(self):
+        # Sirf uploads: token-bucket jaisa, har send ke beech 1/BOT_RATE ka gap
+        # pick() sabse jaldi free bot deta hai: ye bhi lambe FloodWait me hai toh sab hain
+        if self.flood_wait() > BOT_MAX_FLOOD_WAIT: raise BotsFlooded(self.flood_wait())
+        now = time.monotonic()
+        slot = max(now, self.ready_at())
+        self.next_slot = slot + 1 / BOT_RATE
+        if slot > now: await asyncio.sleep(slot - now)
+
+    def flood_wait(self):
+        # getFile ke liye: upload budget nahi, bas chalu FloodWait cooldown
+        return max(0.0, self.flood_until - time.monotonic())
+
+    def flood(self, seconds: float):
+        self.flood_until = max(self.flood_until, time.monotonic() + seconds)
+        print(f"🌊 FloodWait: bot {self.bot_id} cooling for {seconds}s")
+
+class BotPool:
+    def __init__(self, tokens):
+        self.bots = [TelegramBot(t, i) for i, t in enumerate(tokens)]
+
+    def pick(self):
+        # Uploads: logged-in bots me jo sabse jaldi free ho (koi login na hua toh default bot)
+        online = [b for b in self.bots if b.online] or self.bots[:1]
+        return min(online, key=lambda b: b.ready_at())
+
+    def get(self, bot_id):
+        # Purane docs me bot id nahi hai -> default (pehla) bot
+        for b in self.bots:
+            if b.bot_id == bot_id: return b
+        return self.bots[0]
+
+    @staticmethod
+    def import_pyrogram():
+        # pyrogram import time pe get_event_loop() maangta hai; thread me temporary loop do
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        try:
+            importlib.import_module("pyrogram")
+        finally:
+            asyncio.set_event_loop(None)
+            loop.close()
+
+    async def start(self):
+        # Import thread me: event loop (cache hits) block na ho
+        await asyncio.to_thread(self.import_pyrogram)
+
+        async def boot(b):
+            try:
+                if b.client is None: b.client = b.new_client()
+                await b.client.start()
+                me = await b.client.get_me()
+                b.online = True
+                print(f"✅ Bot Started: {me.first_name} (@{me.username})")
+            except Exception as e:
+                print(f"⚠️ Warning: Bot {b.bot_id} start nahi hua ya Logger Channel ({LOGGER_ID}) mein Admin nahi hai!")
+                print(f"Error: {e}")
+
+        # Login fail ho toh bhi pool me rehta hai: uske uploads ka getFile HTTP token se chalega
+        await asyncio.gather(*(boot(b) for b in self.bots))
+
+    async def stop(self):
+        for b in self.bots:
+            if not b.online: continue
+            try:
+                await b.client.stop()
+            except Exception:
+                pass
+
+bot_pool = BotPool(BOT_TOKENS)
+bots_ready = asyncio.Event()  # upload isse pehle nahi hoga
 
 # ─────────────────────────────
 # DATABASE
 # ─────────────────────────────
 mongo = AsyncIOMotorClient(MONGO_URL)
-db = mongo["MusicAPI_DB120"]
+db = mongo[MONGO_DB_NAME]
 videos_col = db["telegram_files_v2"]  
 keys_col = db["api_users"]            
+queries_col = db["search_cache"]
+leases_col = db["miss_leases"]        # (type:yt_id) -> kaunsa node download/upload kar raha hai
+upload_requests_col = db["upload_requests"]  # api-role nodes yahan miss daalte hain
+jobs_col = db["async_jobs"]
+track_hits_col = db["track_hits"]     # (yt_id, hour) -> audio/video hits
+usage_col = db["usage_hourly"]        # (api_key, hour) -> requests (bot.py /top, /usage)
+invalidations_col = db["key_invalidations"]  # /admin/invalidate -> saare workers/nodes
+
+# 🗂️ Lean projections: sirf wahi fields jo code padhta hai
+KEY_PROJECTION = {
+    "_id": 0, "user_id": 1, "active": 1, "daily_limit": 1, "used_today": 1,
+    "total_usage": 1, "last_reset": 1, "owner_name": 1, "expires_at": 1
+}
+
+def file_field(type: str):
+    return "video_file_id" if type == "video" else "audio_file_id"
+
+def track_projection(type: str):
+    return {
+        "_id": 0, "yt_id": 1, "title": 1, "duration": 1, "thumbnail": 1,
+        file_field(type): 1, f"{type}_bot_id": 1
+    }
+
+def index_specs():
+    # (collection, keys, options) — bench/index_report.py bhi yahi list padhta hai
+    # Har hot query api_key / user_id / yt_id pe filter karti hai
+    return [
+        (keys_col, "api_key", {"unique": True}),
+        (keys_col, "user_id", {"unique": True}),
+        (keys_col, "expires_at", {}),  # maintenance expiry sweep
+        (videos_col, "yt_id", {"unique": True}),
+        # default_language none: Hindi/Punjabi titles me stop-words/stemming mat lagao
+        (videos_col, [("title", "text")], {"default_language": "none", "name": "title_text"}),
+        (queries_col, "q", {"unique": True}),
+        (queries_col, "created_at", {"expireAfterSeconds": QUERY_CACHE_TTL}),
+        (leases_col, "expires_at", {"expireAfterSeconds": 0}),
+        (upload_requests_col, "requested_at", {"expireAfterSeconds": LEASE_TTL * 10}),
+        (upload_requests_col, "result_expires_at", {"expireAfterSeconds": 0}),
+        (jobs_col, "created_at", {"expireAfterSeconds": JOB_TTL}),
+        (track_hits_col, "hour", {"expireAfterSeconds": HIT_LOG_TTL}),
+        (usage_col, "hour", {"expireAfterSeconds": USAGE_HISTORY_TTL}),
+        (usage_col, [("user_id", 1), ("hour", 1)], {}),
+        (invalidations_col, "at", {"expireAfterSeconds": 3600}),
+    ]
+
+async def ensure_indexes():
+    for col, field, opts in index_specs():
+        try:
+            await col.create_index(field, **opts)
+        except Exception as e:
+            # Purane duplicate docs ho toh unique index fail hoga; API phir bhi chale
+            print(f"⚠️ Index error on {col.name}.{field}: {e}")
+
+metadata_pool = MetadataPool(METADATA_WORKERS, METADATA_QUEUE, METADATA_TIMEOUT, METADATA_MAX_JOBS)
+download_pool = DownloadPool(LOCAL_DOWNLOAD_WORKERS if LOCAL_DOWNLOAD else 0)
+
+yt_search = YouTubeSearch(YOUTUBE_API_KEYS, lambda: get_http(), YT_KEY_DAILY_QUOTA, YT_KEY_COOLDOWN, YT_API_TIMEOUT)
+
+# ─────────────────────────────
+# 📊 METRICS (Prometheus)
+# ─────────────────────────────
+STAGE_SECONDS = Histogram(
+    "api_stage_seconds", "Per-stage latency of the request pipeline", ["stage"],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+)
+CACHE_REQUESTS = Counter("api_cache_requests_total", "videos_col cache lookups", ["result", "type"])
+BYTES_DOWNLOADED = Counter("api_bytes_downloaded_total", "Bytes downloaded from the external downloader")
+BYTES_UPLOADED = Counter("api_bytes_uploaded_total", "Bytes uploaded to Telegram")
+UPSTREAM_ERRORS = Counter("api_upstream_errors_total", "Upstream failures", ["upstream", "kind"])
+STREAM_PROXY_REQUESTS = Counter("api_stream_proxy_requests_total", "Proxy-mode stream requests", ["result"])
+MISS_REJECTED = Counter("api_miss_rejected_total", "Misses rejected by admission control", ["priority"])
+MISS_QUEUED = Gauge("api_miss_queued", "Misses waiting for an admission slot", multiprocess_mode="livesum")
+DOWNLOAD_WINNERS = Counter("api_download_source_total", "Which source delivered the file", ["source"])
+PREFETCH_RESULTS = Counter("api_prefetch_total", "Background warm-ups", ["result"])
+INFLIGHT_MISSES = Gauge("api_inflight_misses", "Cache misses currently downloading/uploading", multiprocess_mode="livesum")
+
+# ─────────────────────────────
+# HTTP POOL
+# ─────────────────────────────
+http_session = None
+
+def get_http():
+    # Startup pe banta hai; koi path pehle call kare toh lazily ban jayega
+    global http_session
+    if http_session is None or http_session.closed:
+        connector = aiohttp.TCPConnector(
+            limit=HTTP_POOL_LIMIT,
+            limit_per_host=HTTP_POOL_PER_HOST,
+            ttl_dns_cache=HTTP_DNS_TTL,
+            keepalive_timeout=HTTP_KEEPALIVE
+        )
+        http_session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=None, sock_connect=HTTP_CONNECT_TIMEOUT)
+        )
+    return http_session
 
 # ─────────────────────────────
 # STARTUP
 # ─────────────────────────────
-@app.on_event("startup")
-async def startup_event():
-    print("🤖 Starting Telegram Client...")
-    await bot.start()
-    
-    # 🔥 Self-Check
+# Readiness: liveness "/" pe, yahan warm-up ke components
+readiness = {"indexes": False, "disk_cache": False, "telegram": False, "yt_dlp": False}
+
+async def warm_component(name: str, work):
     try:
-        me = await bot.get_me()
-        print(f"✅ Bot Started: {me.first_name} (@{me.username})")
+        await work()
     except Exception as e:
-        print(f"⚠️ Warning: Bot shayad Logger Channel ({LOGGER_ID}) mein Admin nahi hai!")
-        print(f"Error: {e}")
+        # Degraded hi sahi, serve karte raho
+        print(f"⚠️ Warm-up {name} failed: {e}")
+    finally:
+        # Aakhri component: duration flag se pehle, taaki /ready kabhi None format na kare
+        if all(done for n, done in readiness.items() if n != name):
+            app.state.warmup_seconds = time.monotonic() - app.state.warmup_started
+        readiness[name] = True
+
+async def start_telegram():
+    if not CAN_UPLOAD:
+        print(f"🌐 Node role '{NODE_ROLE}': uploads dusre nodes karenge")
+        return
+    try:
+        print(f"🤖 Starting {len(bot_pool.bots)} Telegram Client(s)...")
+        await bot_pool.start()
+        print("✅ Telegram Client Ready!")
+    finally:
+        bots_ready.set()
+    app.state.background.append(asyncio.create_task(upload_request_loop()))
+
+async def warm_yt_dlp():
+    # Thread mode (workers=0) me yt_dlp isi process me chalega; searches ke liye pool workers spawn + warm
+    if metadata_pool.workers <= 0 or (LOCAL_DOWNLOAD and download_pool.workers <= 0):
+        await asyncio.to_thread(importlib.import_module, "yt_dlp")
+    warmed = await metadata_pool.prime()
+    if warmed: print(f"🎬 Metadata pool warm: {warmed} workers")
+
+async def warm_up():
+    app.state.warmup_started = time.monotonic()
+    await asyncio.gather(
+        warm_component("indexes", ensure_indexes),
+        warm_component("disk_cache", lambda: asyncio.to_thread(disk_cache.load)),
+        warm_component("telegram", start_telegram),
+        warm_component("yt_dlp", warm_yt_dlp),
+    )
+    print(f"🔥 Warm-up done in {app.state.warmup_seconds:.2f}s")
+
+@app.on_event("startup")
+async def startup_event():
+    get_http()
+    metadata_pool.start()
+    download_pool.start()
+
+    app.state.background = []
+    app.state.warmup_seconds = None
+    if FAST_START:
+        # Port turant khule: health checks aur cache hits login ka wait nahi karenge
+        app.state.background.append(asyncio.create_task(warm_up()))
+    else:
+        await warm_up()
 
-    print("✅ Telegram Client Ready!")
+    app.state.usage_flusher = asyncio.create_task(usage_flush_loop())
+    app.state.background.append(asyncio.create_task(maintenance_loop()))
+    if PREFETCH:
+        app.state.background.append(asyncio.create_task(prefetch_worker()))
+        app.state.background.append(asyncio.create_task(trending_prefetch_loop()))
+    app.state.job_workers = [asyncio.create_task(job_worker()) for _ in range(JOB_WORKERS)]
 
 @app.on_event("shutdown")
 async def shutdown_event():
-    await bot.stop()
+    app.state.usage_flusher.cancel()
+    for w in app.state.job_workers + app.state.background: w.cancel()
+    await flush_usage()
+    await flush_hits()
+    if CAN_UPLOAD: await bot_pool.stop()
+    metadata_pool.stop()
+    download_pool.stop()
+    if http_session and not http_session.closed:
+        await http_session.close()
+    if PROMETHEUS_MULTIPROC_DIR: multiprocess.mark_process_dead(os.getpid())
 
 # ─────────────────────────────
 # HELPER FUNCTIONS
 # ─────────────────────────────
-def extract_video_id(q: str):
-    if not q: return None
-    q = q.strip()
-    if len(q) == 11 and re.match(r'^[a-zA-Z0-9_-]{11}$', q): return q
-    patterns = [r'(?:v=|\/)([0-9A-Za-z_-]{11})', r'youtu\.be\/([0-9A-Za-z_-]{11})']
-    for pattern in patterns:
-        match = re.search(pattern, q)
-        if match: return match.group(1)
-    return None
+# 🧠 LRU + TTL CACHE
+MISS = object()
+
+class TTLCache:
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.data = OrderedDict()  # key -> (value, expires_at)
+
+    def get(self, key, default=MISS):
+        item = self.data.get(key)
+        if item is None: return default
+        if item[1] < time.time():
+            del self.data[key]
+            return default
+        self.data.move_to_end(key)
+        return item[0]
+
+    def set(self, key, value, ttl: float = None):
+        self.data[key] = (value, time.time() + (ttl or self.ttl))
+        self.data.move_to_end(key)
+        while len(self.data) > self.maxsize:
+            self.data.popitem(last=False)
+
+    def pop(self, key):
+        self.data.pop(key, None)
+
+# (yt_id, type) -> Telegram file URL, ya None (negative cache)
+stream_cache = TTLCache(STREAM_CACHE_SIZE, STREAM_CACHE_TTL)
+
+# 🔎 SEARCH QUERY CACHE
+query_cache = TTLCache(QUERY_CACHE_SIZE, QUERY_CACHE_TTL)
+
+def normalize_query(q: str):
+    # "Tum Hi Ho!!"  ==  "  tum hi   ho "
+    q = re.sub(r"[^\w\s]", " ", q.casefold())
+    return " ".join(q.split())
+
+async def lookup_query(q: str):
+    norm = normalize_query(q)
+    if not norm: return None
+
+    hit = query_cache.get(norm)
+    if hit is not MISS: return hit
+
+    doc = await queries_col.find_one({"q": norm}, {"_id": 0, "yt_id": 1, "title": 1, "duration": 1, "thumbnail": 1})
+    if not doc: return None
+    hit = (doc["yt_id"], doc.get("title"), doc.get("duration", "0:00"), doc.get("thumbnail"))
+    query_cache.set(norm, hit)
+    return hit
+
+async def remember_query(q: str, vid_id: str, title, duration, thumbnail):
+    norm = normalize_query(q)
+    if not norm: return
+    query_cache.set(norm, (vid_id, title, duration, thumbnail))
+    try:
+        await queries_col.update_one(
+            {"q": norm},
+            {"$set": {
+                "q": norm, "yt_id": vid_id, "title": title, "duration": duration,
+                "thumbnail": thumbnail, "created_at": datetime.datetime.utcnow()
+            }}, upsert=True
+        )
+    except Exception as e:
+        print(f"⚠️ Search cache write error: {e}")
+
+# 📚 LOCAL SEARCH (already uploaded tracks)
+def match_confidence(norm_query: str, title: str):
+    # Query ke kitne words title me hain (0..1), tie-break ke liye title coverage
+    q_tokens = set(norm_query.split())
+    t_tokens = set(normalize_query(title or "").split())
+    if not q_tokens or not t_tokens: return 0.0, 0.0
+    common = len(q_tokens & t_tokens)
+    return common / len(q_tokens), common / len(t_tokens)
 
-def format_time(seconds):
-    try: return f"{int(seconds)//60}:{int(seconds)%60:02d}"
-    except: return "0:00"
+async def local_search(q: str):
+    norm = normalize_query(q)
+    if not LOCAL_SEARCH or len(norm.split()) < LOCAL_SEARCH_MIN_TOKENS: return None
+
+    try:
+        cursor = videos_col.find(
+            {"$text": {"$search": norm}},
+            {"_id": 0, "yt_id": 1, "title": 1, "duration": 1, "thumbnail": 1, "score": {"$meta": "textScore"}}
+        ).sort([("score", {"$meta": "textScore"})]).limit(LOCAL_SEARCH_CANDIDATES)
+        candidates = await cursor.to_list(LOCAL_SEARCH_CANDIDATES)
+    except Exception as e:
+        print(f"⚠️ Local search error: {e}")
+        return None
+
+    best, best_conf = None, (0.0, 0.0)
+    for doc in candidates:
+        conf = match_confidence(norm, doc.get("title"))
+        if conf > best_conf: best, best_conf = doc, conf
+
+    if not best or best_conf[0] < LOCAL_SEARCH_THRESHOLD: return None
+    return best["yt_id"], best.get("title"), best.get("duration", "0:00"), best.get("thumbnail")
+
+# ▶️ METADATA: YouTube Data API pehle, phir yt_dlp pool
+async def get_metadata(query: str):
+    with STAGE_SECONDS.labels("metadata").time():
+        found = await yt_search.lookup(query)
+        if found: return found
+        if yt_search.enabled:
+            UPSTREAM_ERRORS.labels("youtube_api", "fallback").inc()
+        return await metadata_pool.extract(query)
+
+# 🆔 Sirf 11-char YouTube id (stream path / disk cache file name isi se bante hain)
+VIDEO_ID = re.compile(r"[a-zA-Z0-9_-]{11}")
+
+# 🔑 KEY CACHE
+# api_key -> (doc, fetched_at). Invalid keys bhi (None) cache hote hain.
+key_cache = {}
+# api_key -> requests jo abhi Mongo me flush nahi hue (usage_day ke)
+pending_usage = {}
+usage_day = str(datetime.date.today())
+# Midnight se pehle ke unflushed counts: day -> {api_key: n}
+older_usage = {}
+
+def roll_usage_day():
+    # Din badla toh pending counts purane din ke hisaab me (dusre worker ka reset inhe aaj me na gine)
+    global usage_day
+    today = str(datetime.date.today())
+    if today == usage_day: return
+    if pending_usage:
+        day_batch = older_usage.setdefault(usage_day, {})
+        for k, n in pending_usage.items(): day_batch[k] = day_batch.get(k, 0) + n
+        pending_usage.clear()
+    usage_day = today
+
+async def get_key_doc(key: str):
+    hit = key_cache.get(key)
+    if hit and time.time() - hit[1] < KEY_CACHE_TTL:
+        return hit[0]
+
+    doc = await keys_col.find_one({"api_key": key}, KEY_PROJECTION)
+    if len(key_cache) >= KEY_CACHE_MAX:
+        key_cache.pop(next(iter(key_cache)))
+    key_cache[key] = (doc, time.time())
+    return doc
+
+def invalidate_user_keys(user_id: int):
+    stale = [k for k, (doc, _) in key_cache.items() if doc and doc.get("user_id") == user_id]
+    for k in stale:
+        key_cache.pop(k, None)
+    return len(stale)
+
+# Dusre workers/nodes ke /admin/invalidate yahan se pakde jaate hain
+last_invalidation = datetime.datetime.utcnow()
+
+async def sync_invalidations():
+    global last_invalidation
+    try:
+        async for doc in invalidations_col.find({"at": {"$gt": last_invalidation}}, {"_id": 0, "user_id": 1, "at": 1}):
+            invalidate_user_keys(doc["user_id"])
+            last_invalidation = max(last_invalidation, doc["at"])
+    except Exception as e:
+        print(f"⚠️ Invalidation sync error: {e}")
 
 # 🔥 LIMIT CHECKER
-async def check_api_limit(key: str):
-    user = await keys_col.find_one({"api_key": key})
+async def check_api_limit(key: str, cost: int = 1):
+    user = await get_key_doc(key)
     if not user or not user.get("active", True):
         return False, "Invalid or Inactive API Key"
+    if user.get("expires_at") and user["expires_at"] < time.time():
+        # Sweep abhi tak nahi chala, phir bhi expired key na chale
+        return False, "API Key Expired"
     
     today = str(datetime.date.today())
+    roll_usage_day()
     if user.get("last_reset") != today:
-        await keys_col.update_one(
-            {"api_key": key}, 
-            {"$set": {"used_today": 0, "last_reset": today}}
-        )
+        # DB reset maintenance loop karega; yahan sirf cached copy
         user["used_today"] = 0 
+        user["last_reset"] = today
     
     daily_limit = user.get("daily_limit", 100)
-    if user.get("used_today", 0) >= daily_limit:
+    if user.get("used_today", 0) + pending_usage.get(key, 0) + cost > daily_limit:
         return False, "Daily Limit Exceeded."
     
     return True, None
 
-# 🔥 INCREMENT COUNTER
-async def increment_usage(key: str):
-    await keys_col.update_one(
-        {"api_key": key}, 
-        {"$inc": {"used_today": 1, "total_usage": 1}}
+# 🔥 INCREMENT COUNTER (Memory me, flush loop Mongo me likhega)
+async def increment_usage(key: str, n: int = 1):
+    roll_usage_day()
+    pending_usage[key] = pending_usage.get(key, 0) + n
+
+async def flush_usage():
+    roll_usage_day()
+    batches = dict(older_usage)
+    older_usage.clear()
+    if pending_usage:
+        batches[usage_day] = dict(pending_usage)
+        pending_usage.clear()
+    if not batches: return
+
+    # Har batch apne din ke quota me; us din ka reset ho chuka (kisi bhi worker se) toh sirf total_usage
+    ops = []
+    for day, batch in batches.items():
+        for k, n in batch.items():
+            ops.append(UpdateOne({"api_key": k, "last_reset": day}, {"$inc": {"used_today": n, "total_usage": n}}))
+            ops.append(UpdateOne({"api_key": k, "last_reset": {"$ne": day}}, {"$inc": {"total_usage": n}}))
+    try:
+        await keys_col.bulk_write(ops, ordered=False)
+    except Exception as e:
+        print(f"❌ Usage Flush Error: {e}")
+        # Wapas daal do, agle round me retry (apne hi din ke saath)
+        for day, batch in batches.items():
+            target = pending_usage if day == usage_day else older_usage.setdefault(day, {})
+            for k, n in batch.items():
+                target[k] = target.get(k, 0) + n
+        return
+
+    # Cached docs ko bhi update karo taaki limit check sahi rahe
+    totals = {}
+    for day, batch in batches.items():
+        for k, n in batch.items():
+            totals[k] = totals.get(k, 0) + n
+            hit = key_cache.get(k)
+            if hit and hit[0]:
+                if hit[0].get("last_reset") == day:
+                    hit[0]["used_today"] = hit[0].get("used_today", 0) + n
+                hit[0]["total_usage"] = hit[0].get("total_usage", 0) + n
+
+    await record_usage_history(totals)
+
+async def record_usage_history(batch):
+    # Har key ka ek doc per hour; counters pe retry ho chuka hai, history best effort
+    hour = datetime.datetime.utcnow().replace(minute=0, second=0, microsecond=0)
+    bucket = hour.strftime("%Y%m%d%H")
+    ops = []
+    for k, n in batch.items():
+        fields = {"api_key": k, "hour": hour}
+        hit = key_cache.get(k)
+        if hit and hit[0]: fields["user_id"] = hit[0].get("user_id")
+        ops.append(UpdateOne({"_id": f"{k}:{bucket}"}, {"$set": fields, "$inc": {"requests": n}}, upsert=True))
+    try:
+        await usage_col.bulk_write(ops, ordered=False)
+    except Exception as e:
+        print(f"⚠️ Usage History Error: {e}")
+
+async def usage_flush_loop():
+    while True:
+        await asyncio.sleep(USAGE_FLUSH_INTERVAL)
+        await flush_usage()
+        await flush_hits()
+        await sync_invalidations()
+
+# 🧹 MAINTENANCE (quota reset / expiry sweep / temp cleanup) — request path pe kuch nahi
+TEMP_FILE = re.compile(r"^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}\.[\w.]+$")
+
+async def reset_daily_quotas(today: str):
+    # Kal ke pending requests kal ke hisaab me jayenge, phir ek hi update_many
+    # (dusre workers ke late flush bhi last_reset dekh ke sirf total_usage me jaate hain)
+    await flush_usage()
+    res = await keys_col.update_many(
+        {"last_reset": {"$ne": today}},
+        {"$set": {"used_today": 0, "last_reset": today}}
     )
+    for doc, _ in key_cache.values():
+        if doc and doc.get("last_reset") != today:
+            doc["used_today"] = 0
+            doc["last_reset"] = today
+    if res.modified_count: print(f"🌅 Daily quota reset for {res.modified_count} keys")
 
-# 🔥 METADATA
-def get_video_metadata(query: str):
-    ydl_opts = {
-        'quiet': True, 'skip_download': True, 'extract_flat': True, 'noplaylist': True,
-        'extractor_args': {'youtube': {'player_client': ['android', 'web']}}
-    }
+async def expire_keys():
+    # bot.py /extend "expired" flag dekh ke key wapas on karega (/disable wale nahi)
+    res = await keys_col.update_many(
+        {"active": True, "expires_at": {"$lt": int(time.time())}},
+        {"$set": {"active": False, "expired": True}}
+    )
+    # Cached docs pe check_api_limit khud expires_at dekhta hai, cache clear ki zarurat nahi
+    if res.modified_count: print(f"⌛ Deactivated {res.modified_count} expired keys")
+
+def reap_temp_files():
+    # Crash/cancel ke baad bache /tmp/<uuid>.mp3|.mp4|.part aur stream cache ke .part
+    cutoff = time.time() - TEMP_MAX_AGE
+    removed = 0
+    for root, match in (("/tmp", TEMP_FILE.match), (STREAM_DISK_DIR, lambda n: n.endswith(".part"))):
+        try:
+            entries = list(os.scandir(root))
+        except FileNotFoundError:
+            continue
+        for entry in entries:
+            try:
+                if entry.is_file() and match(entry.name) and entry.stat().st_mtime < cutoff:
+                    os.remove(entry.path)
+                    removed += 1
+            except OSError:
+                pass
+    if removed: print(f"🧹 Removed {removed} stale temp files")
+
+def seconds_to_midnight():
+    now = datetime.datetime.now()
+    tomorrow = datetime.datetime.combine(now.date() + datetime.timedelta(days=1), datetime.time())
+    return (tomorrow - now).total_seconds()
+
+async def maintenance_step(name: str, step):
     try:
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-            direct_id = extract_video_id(query)
-            if direct_id:
-                info = ydl.extract_info(f"https://www.youtube.com/watch?v={direct_id}", download=False)
-                thumb = info.get('thumbnail') or f"https://i.ytimg.com/vi/{direct_id}/hqdefault.jpg"
-                return direct_id, info.get('title'), format_time(info.get('duration')), thumb
-            else:
-                info = ydl.extract_info(f"ytsearch1:{query}", download=False)
-                if info and 'entries' in info and info['entries']:
-                    v = info['entries'][0]
-                    vid_id = v['id']
-                    thumb = v.get('thumbnail') or f"https://i.ytimg.com/vi/{vid_id}/hqdefault.jpg"
-                    return vid_id, v['title'], format_time(v.get('duration')), thumb
+        await step()
+        return True
+    except asyncio.CancelledError:
+        raise
     except Exception as e:
-        print(f"Metadata Error: {e}")
-    return None, None, None, None
+        print(f"❌ Maintenance Error ({name}): {e}")
+        return False
+
+async def maintenance_loop():
+    # Startup pe bhi ek round: node midnight pe down tha toh reset miss na ho
+    last_reset = None
+    while True:
+        today = str(datetime.date.today())
+        if today != last_reset and await maintenance_step("quota reset", lambda: reset_daily_quotas(today)):
+            last_reset = today
+        await maintenance_step("expiry sweep", expire_keys)
+        await maintenance_step("temp reaper", lambda: asyncio.to_thread(reap_temp_files))
+        await asyncio.sleep(min(MAINTENANCE_INTERVAL, seconds_to_midnight() + 1))
+
+# 💾 DOWNLOAD BUFFER
+# Chhoti files RAM me hi rehti hain aur seedha Telegram upload hoti hain.
+# Limit cross hui toh /tmp file pe roll over, writes thread me (event loop block nahi).
+class DownloadBuffer:
+    def __init__(self, ext: str):
+        self.ext = ext
+        self.mem = io.BytesIO()
+        self.path = None
+        self.fp = None
+        self.size = 0
+
+    async def write(self, chunk: bytes):
+        if self.fp is None and self.size + len(chunk) > DOWNLOAD_SPOOL_MAX:
+            await self.rollover()
+        if self.fp is not None:
+            await asyncio.to_thread(self.fp.write, chunk)
+        else:
+            self.mem.write(chunk)
+        self.size += len(chunk)
+
+    async def rollover(self):
+        self.path = f"/tmp/{uuid.uuid4()}.{self.ext}"
+        self.fp = await asyncio.to_thread(open, self.path, "wb")
+        await asyncio.to_thread(self.fp.write, self.mem.getvalue())
+        self.mem = None
+
+    async def finish(self):
+        # Upload ke liye source: BytesIO ya file path
+        if self.fp is not None:
+            await asyncio.to_thread(self.fp.close)
+            return self.path
+        self.mem.seek(0)
+        return self.mem
+
+    @classmethod
+    def adopt(cls, path: str, ext: str):
+        # Local yt_dlp ne jo file banayi usko buffer jaisa treat karo
+        buf = cls(ext)
+        buf.mem = None
+        buf.path = path
+        buf.size = os.path.getsize(path)
+        return buf
+
+    async def reset(self):
+        # Upstream ne Range ignore kiya -> shuru se
+        self.cleanup()
+        self.mem = io.BytesIO()
+        self.path = None
+        self.fp = None
+        self.size = 0
+
+    def cleanup(self):
+        if self.fp is not None and not self.fp.closed:
+            self.fp.close()
+        if self.path and os.path.exists(self.path):
+            os.remove(self.path)
+        self.mem = None
 
 # 🔥 DOWNLOADER
-async def download_via_shrutibots(video_id: str, type: str):
+class DownloadStalled(Exception):
+    pass
+
+def expected_size(resp):
+    # 206: "bytes 100-999/1000" -> 1000, 200: Content-Length
+    rng = resp.headers.get("Content-Range", "")
+    if "/" in rng and not rng.endswith("*"):
+        return int(rng.rsplit("/", 1)[1])
+    if resp.status == 200 and resp.content_length:
+        return resp.content_length
+    return None
+
+async def download_via_shrutibots(video_id: str, type: str, first_byte: asyncio.Event = None):
     ext = "mp4" if type == "video" else "mp3"
-    random_name = str(uuid.uuid4())
-    out_path = f"/tmp/{random_name}.{ext}"
+    buf = DownloadBuffer(ext)
+    ok = False
+    total = None
     try:
-        async with aiohttp.ClientSession() as session:
-            token_url = f"{EXTERNAL_API_URL}/download"
-            params = {"url": video_id, "type": type}
-            async with session.get(token_url, params=params, timeout=20) as resp:
-                if resp.status != 200: return None
-                data = await resp.json()
-                token = data.get("download_token")
-            if not token: return None
-
-            stream_url = f"{EXTERNAL_API_URL}/stream/{video_id}?type={type}"
-            headers = {"X-Download-Token": token}
-            async with session.get(stream_url, headers=headers, timeout=1200) as resp:
-                if resp.status != 200: return None
-                with open(out_path, "wb") as f:
-                    async for chunk in resp.content.iter_chunked(16384):
-                        f.write(chunk)
-            if os.path.exists(out_path) and os.path.getsize(out_path) > 1024:
-                return out_path
+        session = get_http()
+        for attempt in range(DOWNLOAD_RETRIES + 1):
+            if attempt:
+                await asyncio.sleep(DOWNLOAD_BACKOFF * 2 ** (attempt - 1))
+            try:
+                token_url = f"{EXTERNAL_API_URL}/download"
+                params = {"url": video_id, "type": type}
+                async with session.get(token_url, params=params, timeout=aiohttp.ClientTimeout(total=HTTP_TOKEN_TIMEOUT)) as resp:
+                    if resp.status != 200:
+                        UPSTREAM_ERRORS.labels("downloader", f"http_{resp.status}").inc()
+                        # 4xx (429 chhod ke) retry se theek nahi hoga
+                        if 400 <= resp.status < 500 and resp.status != 429: return None
+                        continue
+                    data = await resp.json()
+                    token = data.get("download_token")
+                if not token:
+                    UPSTREAM_ERRORS.labels("downloader", "no_token").inc()
+                    continue
+
+                stream_url = f"{EXTERNAL_API_URL}/stream/{video_id}?type={type}"
+                headers = {"X-Download-Token": token}
+                if buf.size:
+                    # Resume: jahan tak mila wahan se aage
+                    headers["Range"] = f"bytes={buf.size}-"
+                timeout = aiohttp.ClientTimeout(total=HTTP_DOWNLOAD_TIMEOUT, sock_read=DOWNLOAD_STALL_WINDOW)
+                async with session.get(stream_url, headers=headers, timeout=timeout) as resp:
+                    if resp.status not in (200, 206):
+                        UPSTREAM_ERRORS.labels("downloader", f"http_{resp.status}").inc()
+                        continue
+                    if resp.status == 200 and buf.size:
+                        await buf.reset()
+                    total = expected_size(resp) or total
+
+                    window_start, window_bytes = time.monotonic(), 0
+                    async for chunk in resp.content.iter_chunked(DOWNLOAD_CHUNK):
+                        if first_byte: first_byte.set()
+                        await buf.write(chunk)
+                        BYTES_DOWNLOADED.inc(len(chunk))
+
+                        # Stall detection: window me min throughput
+                        window_bytes += len(chunk)
+                        elapsed = time.monotonic() - window_start
+                        if elapsed >= DOWNLOAD_STALL_WINDOW:
+                            if window_bytes / elapsed < DOWNLOAD_MIN_RATE:
+                                raise DownloadStalled(f"{window_bytes / elapsed:.0f} B/s")
+                            window_start, window_bytes = time.monotonic(), 0
+
+                if total and buf.size < total:
+                    # Connection beech me band, agle attempt me resume
+                    UPSTREAM_ERRORS.labels("downloader", "short_read").inc()
+                    continue
+                break
+            except (aiohttp.ClientError, asyncio.TimeoutError, DownloadStalled) as e:
+                print(f"⚠️ Download attempt {attempt + 1} failed ({video_id}): {e!r}")
+                UPSTREAM_ERRORS.labels("downloader", e.__class__.__name__).inc()
+        else:
             return None
+
+        if buf.size > 1024:
+            await buf.finish()
+            ok = True
+            return buf
+        UPSTREAM_ERRORS.labels("downloader", "too_small").inc()
+        return None
     except Exception as e:
         print(f"❌ Download Error: {e}")
+        UPSTREAM_ERRORS.labels("downloader", e.__class__.__name__).inc()
         return None
+    finally:
+        # Success pe caller cleanup karega, baaki har raaste pe yahin
+        if not ok: buf.cleanup()
+
+def discard_local_result(worker, out_base: str):
+    # Cancel ke baad worker ne file bana di ho toh hata do (cancel file bhi)
+    path = None if worker.cancelled() or worker.exception() else worker.result()
+    for p in (path, cancel_path(out_base)):
+        if p and os.path.exists(p): os.remove(p)
+
+async def download_via_ytdlp(video_id: str, type: str):
+    ext = "mp4" if type == "video" else "mp3"
+    out_base = f"/tmp/{uuid.uuid4()}"
+    worker = asyncio.ensure_future(download_pool.download(video_id, type, out_base))
+    try:
+        path = await asyncio.shield(worker)
+    except asyncio.CancelledError:
+        # Worker process cancel file dekh ke ruk jayega aur adhoori files hata dega
+        with open(cancel_path(out_base), "w"): pass
+        worker.add_done_callback(lambda w: discard_local_result(w, out_base))
+        raise
+    if not path: return None
+    return DownloadBuffer.adopt(path, ext)
+
+async def download_track(video_id: str, type: str):
+    # External API pehle; TTFB slow ho toh local yt_dlp hedge, jo pehle khatam wahi jeeta
+    first_byte = asyncio.Event()
+    external = asyncio.create_task(download_via_shrutibots(video_id, type, first_byte))
+    pending = {external}
+    try:
+        if not LOCAL_DOWNLOAD:
+            return await external
+
+        if HEDGE_TTFB > 0:
+            ttfb = asyncio.create_task(first_byte.wait())
+            await asyncio.wait({external, ttfb}, timeout=HEDGE_TTFB, return_when=asyncio.FIRST_COMPLETED)
+            ttfb.cancel()
+        if not HEDGE_TTFB > 0 or first_byte.is_set():
+            # Bytes aa rahe hain (ya hedge off): external ko poora karne do
+            await asyncio.wait({external})
+
+        if external.done():
+            pending = set()
+            buf = external.result()
+            if buf:
+                DOWNLOAD_WINNERS.labels("external").inc()
+                return buf
+            # External fail -> seedha local
+            buf = await download_via_ytdlp(video_id, type)
+            if buf: DOWNLOAD_WINNERS.labels("local").inc()
+            return buf
+
+        # Hedge: dono race karo
+        print(f"🏁 Hedging download for {video_id} (TTFB > {HEDGE_TTFB}s)")
+        local = asyncio.create_task(download_via_ytdlp(video_id, type))
+        pending = {external, local}
+        winner = None
+        while pending and not winner:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                buf = task.result()
+                if not buf: continue
+                if winner:
+                    buf.cleanup()  # dono saath khatam hue
+                    continue
+                winner = buf
+                DOWNLOAD_WINNERS.labels("external" if task is external else "local").inc()
+        return winner
+    finally:
+        # Haarne wala (ya caller cancel) -> band karo; unke finally temp files saaf karte hain
+        for task in pending:
+            task.cancel()
 
 # 🔥 UPLOADER (Updated: Fixes file_0.bin issue) 🛠️
-async def upload_to_telegram(file_path: str, title: str, duration: str, vid_id: str, link: str, type: str):
+async def upload_to_telegram(file_path, title: str, duration: str, vid_id: str, link: str, type: str):
+    # FAST_START: login background me chal raha ho toh uska wait
+    await bots_ready.wait()
+    from pyrogram.errors import FloodWait
     try:
         # 1. Filename Clean karo
         clean_title = re.sub(r'[\\/*?:"<>|]', "", title)
@@ -186,109 +1015,700 @@ async def upload_to_telegram(file_path: str, title: str, duration: str, vid_id:
 
         print(f"🚀 Uploading as: {final_filename}...")
 
-        if type == "video":
-            msg = await bot.send_video(
-                LOGGER_ID, 
-                file_path, 
-                caption=caption, 
-                supports_streaming=True,
-                file_name=final_filename  # 👈 YE FIX HAI
-            )
-            return msg.video.file_id
-        else:
-            msg = await bot.send_audio(
-                LOGGER_ID, 
-                file_path, 
-                caption=caption, 
-                title=title, 
-                performer="Sudeep API",
-                file_name=final_filename  # 👈 YE FIX HAI
-            )
-            return msg.audio.file_id
+        # FloodWait aaye toh dusre bot pe try karo
+        for _ in range(len(bot_pool.bots) + 1):
+            tg = bot_pool.pick()
+            await tg.acquire()
+            if hasattr(file_path, "seek"): file_path.seek(0)
+            try:
+                if type == "video":
+                    msg = await tg.client.send_video(
+                        LOGGER_ID, 
+                        file_path, 
+                        caption=caption, 
+                        supports_streaming=True,
+                        file_name=final_filename  # 👈 YE FIX HAI
+                    )
+                    return msg.video.file_id, tg.bot_id
+                else:
+                    msg = await tg.client.send_audio(
+                        LOGGER_ID, 
+                        file_path, 
+                        caption=caption, 
+                        title=title, 
+                        performer="Sudeep API",
+                        file_name=final_filename  # 👈 YE FIX HAI
+                    )
+                    return msg.audio.file_id, tg.bot_id
+            except FloodWait as e:
+                UPSTREAM_ERRORS.labels("telegram", "flood_wait").inc()
+                tg.flood(e.value)
+
+        raise BotsFlooded(bot_pool.pick().flood_wait())
 
+    except BotsFlooded:
+        raise
     except Exception as e:
         print(f"❌ Upload Error: {e}")
-        return None
+        UPSTREAM_ERRORS.labels("telegram", e.__class__.__name__).inc()
+        return None, None
 
-# ─────────────────────────────
-# 🔥 MAIN LOGIC
-# ─────────────────────────────
-async def process_request(query: str, key: str, type: str):
-    start_time = time.time()
+# 🚦 ADMISSION CONTROL
+# Priority: 0 = Premium, 1 = Free, 2 = background (prefetch / warm-up)
+PRIORITY_PREMIUM, PRIORITY_FREE, PRIORITY_BACKGROUND = 0, 1, 2
 
-    # 1. Limit Check
-    is_allowed, error_msg = await check_api_limit(key)
-    if not is_allowed:
-        return {"status": 403, "error": error_msg}
+class AdmissionFull(Exception):
+    pass
 
-    # ID Extraction
-    clean_query = query.strip()
-    video_id = extract_video_id(clean_query)
-    title, duration, thumbnail = None, "0:00", None
+class AdmissionGate:
+    def __init__(self, limit: int, max_queue: int):
+        self.limit = limit
+        self.max_queue = max_queue
+        self.active = 0
+        self.waiters = []  # heap: (priority, seq, future)
+        self.seq = 0
 
-    if not video_id:
-        video_id, title, duration, thumbnail = await asyncio.to_thread(get_video_metadata, query)
+    async def acquire(self, priority: int):
+        if self.active < self.limit and not self.waiters:
+            self.active += 1
+            return
 
-    if not video_id: return {"status": 404, "error": "Not Found"}
+        if len(self.waiters) >= self.max_queue:
+            # Queue full: naya caller worst waiter se better ho toh usko nikaalo
+            worst = max(self.waiters)
+            if priority >= worst[0]: raise AdmissionFull()
+            self.waiters.remove(worst)
+            heapq.heapify(self.waiters)
+            worst[2].set_exception(AdmissionFull())
 
-    # Cache Check
-    existing = await videos_col.find_one({"yt_id": video_id})
-    stream_link = f"{BASE_URL}/stream/{video_id}?type={type}"
+        fut = asyncio.get_running_loop().create_future()
+        self.seq += 1
+        entry = (priority, self.seq, fut)
+        heapq.heappush(self.waiters, entry)
+        MISS_QUEUED.set(len(self.waiters))
+        try:
+            await fut  # release() slot hand-off karega
+        except asyncio.CancelledError:
+            if fut.done() and not fut.cancelled() and fut.exception() is None:
+                self.release()
+            elif entry in self.waiters:
+                self.waiters.remove(entry)
+                heapq.heapify(self.waiters)
+            raise
+        finally:
+            MISS_QUEUED.set(len(self.waiters))
 
-    if existing:
-        file_id = existing.get("video_file_id") if type == "video" else existing.get("audio_file_id")
-        if file_id:
-            await increment_usage(key)
-            return {
-                "status": 200,
-                "title": existing.get("title", title),
-                "duration": existing.get("duration", duration),
-                "link": stream_link,
-                "id": video_id,
-                "thumbnail": existing.get("thumbnail", thumbnail),
-                "source": "cache",
-                "type": type,
-                "response_time": f"{time.time() - start_time:.2f}s"
-            }
+    def release(self):
+        while self.waiters:
+            _, _, fut = heapq.heappop(self.waiters)
+            if not fut.done():
+                fut.set_result(None)
+                return
+        self.active -= 1
+
+miss_gate = AdmissionGate(MISS_CONCURRENCY, MISS_QUEUE)
+
+def busy_result():
+    return {"status": 503, "error": "Server Busy, Try Again", "retry_after": MISS_RETRY_AFTER}
+
+async def key_priority(key: str):
+    user = await get_key_doc(key)
+    return PRIORITY_PREMIUM if user and user.get("daily_limit", 100) > PREMIUM_LIMIT else PRIORITY_FREE
+
+# (video_id, type) -> abhi kaunsa stage chal raha hai (/jobs progress ke liye)
+miss_stages = {}
+
+# 🔥 SINGLE-FLIGHT (Same track ka kaam ek hi baar chalega)
+# (video_id, type) -> running Task. Baaki callers usi Task ka result await karte hain.
+inflight_jobs = {}
+
+async def single_flight(job_key, job_factory):
+    task = inflight_jobs.get(job_key)
+    if task is None:
+        task = asyncio.ensure_future(job_factory())
+        inflight_jobs[job_key] = task
+        task.add_done_callback(lambda _: inflight_jobs.pop(job_key, None))
+    # shield: ek client disconnect ho jaye toh baaki waiters ka kaam cancel na ho
+    return await asyncio.shield(task)
+
+async def fetch_and_cache(video_id: str, type: str, title, duration, thumbnail, stream_link: str):
+    stage_key = (video_id, type)
+    INFLIGHT_MISSES.inc()
+    try:
+        return await _fetch_and_cache(stage_key, video_id, type, title, duration, thumbnail, stream_link)
+    finally:
+        INFLIGHT_MISSES.dec()
+        miss_stages.pop(stage_key, None)
 
+async def _fetch_and_cache(stage_key, video_id: str, type: str, title, duration, thumbnail, stream_link: str):
     # Download New
     if not title:
-        _, title, duration, thumbnail = await asyncio.to_thread(get_video_metadata, video_id)
+        miss_stages[stage_key] = "metadata"
+        try:
+            _, title, duration, thumbnail = await get_metadata(video_id)
+        except (PoolBusy, PoolTimeout):
+            pass
         if not title: title = "Unknown"
 
-    file_path = await download_via_shrutibots(video_id, type)
-    if not file_path: return {"status": 500, "error": "Download Failed"}
+    miss_stages[stage_key] = "downloading"
+    with STAGE_SECONDS.labels("download").time():
+        buf = await download_track(video_id, type)
+    if not buf: return {"status": 500, "error": "Download Failed"}
 
-    # Upload New
-    file_id = await upload_to_telegram(file_path, title, duration, video_id, stream_link, type)
-    if os.path.exists(file_path): os.remove(file_path)
+    # Upload New (RAM buffer ya spill file)
+    miss_stages[stage_key] = "uploading"
+    try:
+        with STAGE_SECONDS.labels("upload").time():
+            file_id, bot_id = await upload_to_telegram(buf.path or buf.mem, title, duration, video_id, stream_link, type)
+        if file_id: BYTES_UPLOADED.inc(buf.size)
+    except BotsFlooded as e:
+        print(f"❌ Upload Error: {e}")
+        UPSTREAM_ERRORS.labels("telegram", "flood_wait_cap").inc()
+        return {"status": 503, "error": "Telegram FloodWait, Try Again", "retry_after": int(e.retry_after) + 1}
+    finally:
+        buf.cleanup()
 
     if not file_id: return {"status": 500, "error": "Upload Failed"}
 
     # Save to DB
-    update_field = "video_file_id" if type == "video" else "audio_file_id"
-    await videos_col.update_one(
-        {"yt_id": video_id},
+    miss_stages[stage_key] = "saving"
+    update_field = file_field(type)
+    with STAGE_SECONDS.labels("db_write").time():
+        await videos_col.update_one(
+            {"yt_id": video_id},
+            {"$set": {
+                "yt_id": video_id, "title": title, "duration": duration, "thumbnail": thumbnail,
+                update_field: file_id, f"{type}_bot_id": bot_id, "cached_at": datetime.datetime.now()
+            }}, upsert=True
+        )
+    # Purana negative entry hatao taaki stream turant chale
+    stream_cache.pop((video_id, type))
+
+    return {"status": 200, "title": title, "duration": duration, "thumbnail": thumbnail}
+
+# ─────────────────────────────
+# 🌍 DISTRIBUTED MISS LEASES
+# ─────────────────────────────
+# single_flight ek process ke andar dedupe karta hai; lease poore cluster me.
+def lease_id(video_id: str, type: str):
+    return f"{type}:{video_id}"
+
+async def acquire_lease(lid: str):
+    now = datetime.datetime.utcnow()
+    try:
+        await leases_col.find_one_and_update(
+            {"_id": lid, "$or": [{"expires_at": {"$lt": now}}, {"owner": NODE_ID}]},
+            {"$set": {"owner": NODE_ID, "expires_at": now + datetime.timedelta(seconds=LEASE_TTL)}},
+            upsert=True
+        )
+        return True
+    except DuplicateKeyError:
+        # Kisi aur node ke paas valid lease hai
+        return False
+
+async def renew_lease(lid: str):
+    while True:
+        await asyncio.sleep(LEASE_TTL / 3)
+        await leases_col.update_one(
+            {"_id": lid, "owner": NODE_ID},
+            {"$set": {"expires_at": datetime.datetime.utcnow() + datetime.timedelta(seconds=LEASE_TTL)}}
+        )
+
+async def release_lease(lid: str):
+    try:
+        await leases_col.delete_one({"_id": lid, "owner": NODE_ID})
+    except Exception as e:
+        print(f"⚠️ Lease release error: {e}")
+
+async def cached_result(video_id: str, type: str):
+    doc = await videos_col.find_one({"yt_id": video_id}, track_projection(type))
+    if doc and doc.get(file_field(type)):
+        return {"status": 200, "title": doc.get("title"), "duration": doc.get("duration"), "thumbnail": doc.get("thumbnail")}
+    return None
+
+async def request_upload(video_id: str, type: str, title, duration, thumbnail, stream_link: str, priority: int = PRIORITY_FREE):
+    # api-role node: uploader nodes ke liye request chhod do (idempotent, purana result saaf)
+    # Kai callers ho toh sabse oonchi priority (Premium) jeetegi
+    await upload_requests_col.update_one(
+        {"_id": lease_id(video_id, type)},
         {"$set": {
-            "yt_id": video_id, "title": title, "duration": duration, "thumbnail": thumbnail,
-            update_field: file_id, "cached_at": datetime.datetime.now()
-        }}, upsert=True
+            "yt_id": video_id, "type": type, "title": title, "duration": duration,
+            "thumbnail": thumbnail, "link": stream_link, "requested_at": datetime.datetime.utcnow(),
+            "result": None, "result_expires_at": None
+        }, "$min": {"priority": priority}}, upsert=True
     )
 
-    await increment_usage(key)
+async def report_upload_result(lid: str, result):
+    # Uploader: fail/busy result request doc me, taaki api node ka waiter repost loop me na phase
+    ttl = result.get("retry_after", UPLOAD_FAIL_TTL)
+    try:
+        await upload_requests_col.update_one(
+            {"_id": lid},
+            {"$set": {"result": result, "result_expires_at": datetime.datetime.utcnow() + datetime.timedelta(seconds=ttl)}},
+            upsert=True
+        )
+    except Exception as e:
+        print(f"⚠️ Upload result write error: {e}")
+
+async def upload_result(lid: str):
+    # api node: uploader ne is track pe haal hi me fail/busy diya?
+    req = await upload_requests_col.find_one({"_id": lid}, {"result": 1, "result_expires_at": 1})
+    if req and req.get("result") and req["result_expires_at"] > datetime.datetime.utcnow():
+        return req["result"]
+    return None
+
+async def coordinated_fetch(video_id: str, type: str, title, duration, thumbnail, stream_link: str, priority: int = PRIORITY_FREE):
+    lid = lease_id(video_id, type)
+    deadline = time.monotonic() + LEASE_WAIT_MAX
+    delay = LEASE_POLL
+
+    while True:
+        if CAN_UPLOAD and await acquire_lease(lid):
+            heartbeat = asyncio.create_task(renew_lease(lid))
+            try:
+                # Lease milne tak kisi aur ne upload kar diya ho sakta hai
+                done = await cached_result(video_id, type)
+                if done: return done
+                try:
+                    await miss_gate.acquire(priority)
+                except AdmissionFull:
+                    MISS_REJECTED.labels(str(priority)).inc()
+                    return busy_result()
+                try:
+                    return await fetch_and_cache(video_id, type, title, duration, thumbnail, stream_link)
+                finally:
+                    miss_gate.release()
+            finally:
+                heartbeat.cancel()
+                await release_lease(lid)
+
+        done = await cached_result(video_id, type)
+        if done: return done
+
+        if not CAN_UPLOAD:
+            failed = await upload_result(lid)
+            if failed: return failed
+            lease = await leases_col.find_one({"_id": lid}, {"expires_at": 1})
+            if not lease or lease["expires_at"] < datetime.datetime.utcnow():
+                await request_upload(video_id, type, title, duration, thumbnail, stream_link, priority)
+
+        if time.monotonic() > deadline:
+            return {"status": 504, "error": "Upload Timeout"}
+        await asyncio.sleep(delay)
+        delay = min(delay * 2, LEASE_POLL_MAX)
+
+async def upload_request_loop():
+    # Uploader nodes: api nodes ke misses uthao (Premium pehle, phir purane pehle)
+    sem = asyncio.Semaphore(JOB_WORKERS)
+    while True:
+        try:
+            await sem.acquire()
+            # result wale docs pe kaam ho chuka hai (waiters ke liye pade hain)
+            req = await upload_requests_col.find_one_and_delete({"result": None}, sort=[("priority", 1), ("requested_at", 1)])
+            if not req:
+                sem.release()
+                await asyncio.sleep(LEASE_POLL_MAX)
+                continue
+
+            async def work(r):
+                try:
+                    result = await single_flight(
+                        (r["yt_id"], r["type"]),
+                        lambda: coordinated_fetch(
+                            r["yt_id"], r["type"], r.get("title"), r.get("duration", "0:00"), r.get("thumbnail"), r["link"],
+                            r.get("priority", PRIORITY_BACKGROUND)
+                        )
+                    )
+                except Exception as e:
+                    print(f"❌ Upload Request Error ({r['_id']}): {e}")
+                    result = {"status": 500, "error": "Upload Failed"}
+                finally:
+                    sem.release()
+                # Success cached_result se dikh jayega; fail/busy waiter ko batana padega
+                if result["status"] != 200:
+                    await report_upload_result(r["_id"], result)
+            asyncio.create_task(work(req))
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            sem.release()
+            print(f"❌ Upload Request Loop Error: {e}")
+            await asyncio.sleep(LEASE_POLL_MAX)
 
+# ─────────────────────────────
+# 🔮 POPULARITY LOG + PREFETCH
+# ─────────────────────────────
+# yt_id -> {"audio": n, "video": n} jo abhi Mongo me flush nahi hue
+pending_hits = {}
+
+def record_hit(video_id: str, type: str, n: int = 1):
+    counts = pending_hits.setdefault(video_id, {})
+    counts[type] = counts.get(type, 0) + n
+
+async def flush_hits():
+    if not pending_hits: return
+    batch = dict(pending_hits)
+    pending_hits.clear()
+
+    # Har track ka ek doc per hour: trending = last N hours ka sum
+    hour = datetime.datetime.utcnow().replace(minute=0, second=0, microsecond=0)
+    bucket = hour.strftime("%Y%m%d%H")
+    ops = [
+        UpdateOne({"_id": f"{vid}:{bucket}"}, {"$set": {"yt_id": vid, "hour": hour}, "$inc": counts}, upsert=True)
+        for vid, counts in batch.items()
+    ]
+    try:
+        await track_hits_col.bulk_write(ops, ordered=False)
+    except Exception as e:
+        print(f"❌ Hit Log Flush Error: {e}")
+        for vid, counts in batch.items():
+            for t, n in counts.items(): record_hit(vid, t, n)
+
+# (video_id, type) jo queue me pade hain (dobara enqueue na ho)
+prefetch_queue = asyncio.Queue(maxsize=PREFETCH_QUEUE)
+prefetch_queued = set()
+
+def schedule_prefetch(video_id: str, type: str = "audio"):
+    job_key = (video_id, type)
+    if job_key in prefetch_queued or job_key in inflight_jobs: return False
+    try:
+        prefetch_queue.put_nowait(job_key)
+    except asyncio.QueueFull:
+        PREFETCH_RESULTS.labels("dropped").inc()
+        return False
+    prefetch_queued.add(job_key)
+    return True
+
+def gate_idle():
+    # Koi live miss wait kar raha ho ya aadhe se zyada slots busy -> prefetch ruko
+    return not miss_gate.waiters and miss_gate.active < max(1, int(miss_gate.limit * PREFETCH_IDLE))
+
+async def prefetch_worker():
+    while True:
+        video_id, type = await prefetch_queue.get()
+        try:
+            while not gate_idle():
+                await asyncio.sleep(LEASE_POLL_MAX)
+            if await cached_result(video_id, type):
+                PREFETCH_RESULTS.labels("cached").inc()
+                continue
+
+            stream_link = f"{BASE_URL}/stream/{video_id}?type={type}"
+            if not CAN_UPLOAD:
+                # api node: uploader nodes background priority pe utha lenge
+                await request_upload(video_id, type, None, "0:00", None, stream_link, PRIORITY_BACKGROUND)
+                PREFETCH_RESULTS.labels("requested").inc()
+                continue
+
+            result = await single_flight(
+                (video_id, type),
+                lambda: coordinated_fetch(video_id, type, None, "0:00", None, stream_link, PRIORITY_BACKGROUND)
+            )
+            PREFETCH_RESULTS.labels("warmed" if result["status"] == 200 else "failed").inc()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            PREFETCH_RESULTS.labels("failed").inc()
+            print(f"❌ Prefetch Error ({video_id}): {e}")
+        finally:
+            prefetch_queued.discard((video_id, type))
+            prefetch_queue.task_done()
+        # Rate limit: sirf actual downloads ke beech
+        await asyncio.sleep(1 / PREFETCH_RATE)
+
+async def trending_ids():
+    since = datetime.datetime.utcnow() - datetime.timedelta(hours=PREFETCH_WINDOW)
+    pipeline = [
+        {"$match": {"hour": {"$gte": since}}},
+        {"$group": {"_id": "$yt_id", "hits": {"$sum": {"$add": [{"$ifNull": ["$audio", 0]}, {"$ifNull": ["$video", 0]}]}}}},
+        {"$match": {"hits": {"$gte": PREFETCH_MIN_HITS}}},
+        {"$sort": {"hits": -1}},
+        {"$limit": PREFETCH_TOP},
+    ]
+    return [doc["_id"] async for doc in track_hits_col.aggregate(pipeline)]
+
+async def trending_prefetch_loop():
+    # Trending tracks ka audio pehle se Telegram pe rakho
+    while True:
+        await asyncio.sleep(PREFETCH_INTERVAL)
+        try:
+            ids = await trending_ids()
+            if not ids: continue
+            have = set()
+            async for doc in videos_col.find({"yt_id": {"$in": ids}}, {"_id": 0, "yt_id": 1, "audio_file_id": 1}):
+                if doc.get("audio_file_id"): have.add(doc["yt_id"])
+            queued = sum(schedule_prefetch(vid, "audio") for vid in ids if vid not in have)
+            if queued: print(f"🔮 Prefetching audio for {queued} trending tracks")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"❌ Trending Prefetch Error: {e}")
+
+def cache_response(existing, title, duration, thumbnail, video_id: str, type: str, stream_link: str, start_time: float):
+    return {
+        "status": 200,
+        "title": existing.get("title", title),
+        "duration": existing.get("duration", duration),
+        "link": stream_link,
+        "id": video_id,
+        "thumbnail": existing.get("thumbnail", thumbnail),
+        "source": "cache",
+        "type": type,
+        "response_time": f"{time.time() - start_time:.2f}s"
+    }
+
+def new_upload_response(result, video_id: str, type: str, stream_link: str, start_time: float):
     return {
         "status": 200,
-        "title": title,
-        "duration": duration,
+        "title": result["title"],
+        "duration": result["duration"],
         "link": stream_link,
         "id": video_id,
-        "thumbnail": thumbnail,
+        "thumbnail": result["thumbnail"],
         "source": "new_upload",
         "type": type,
         "response_time": f"{time.time() - start_time:.2f}s"
     }
 
+# 🧵 ASYNC JOBS
+# job_id -> {state: queued/running/done/failed, result: final response}
+jobs = TTLCache(JOB_QUEUE * 10, JOB_TTL)
+job_queue = asyncio.Queue(maxsize=JOB_QUEUE)
+
+async def save_job(job_id: str, job):
+    # Dusre workers/nodes bhi /jobs/{id} answer kar sakein
+    try:
+        await jobs_col.update_one(
+            {"_id": job_id},
+            {"$set": {"state": job["state"], "result": job["result"], "created_at": job["created_at"]}},
+            upsert=True
+        )
+    except Exception as e:
+        print(f"⚠️ Job save error: {e}")
+
+async def job_worker():
+    while True:
+        job, job_factory = await job_queue.get()
+        job["state"] = "running"
+        await save_job(job["id"], job)
+        try:
+            result = await single_flight((job["video_id"], job["type"]), job_factory)
+            if result["status"] == 200:
+                await increment_usage(job["key"])
+                result = new_upload_response(result, job["video_id"], job["type"], job["link"], job["start_time"])
+            job["result"] = result
+            job["state"] = "done" if result["status"] == 200 else "failed"
+        except Exception as e:
+            print(f"❌ Job Error: {e}")
+            job["result"] = {"status": 500, "error": "Job Failed"}
+            job["state"] = "failed"
+        finally:
+            await save_job(job["id"], job)
+            job_queue.task_done()
+
+async def submit_job(key: str, video_id: str, type: str, stream_link: str, start_time: float, job_factory):
+    job_id = uuid.uuid4().hex
+    job = {
+        "id": job_id, "state": "queued", "result": None, "key": key, "created_at": datetime.datetime.utcnow(),
+        "video_id": video_id, "type": type, "link": stream_link, "start_time": start_time
+    }
+    try:
+        job_queue.put_nowait((job, job_factory))
+    except asyncio.QueueFull:
+        return None
+    jobs.set(job_id, job)
+    await save_job(job_id, job)
+    return job_id
+
+# ⚡ Sirf sasti tiers: direct id / link ya query cache. Na mile toh None.
+async def quick_resolve(query: str):
+    clean_query = query.strip()
+    video_id = extract_video_id(clean_query)
+    if video_id: return video_id, None, "0:00", None
+    return await lookup_query(clean_query)
+
+# 🔍 Mehngi tiers: local text index, phir YouTube API / yt_dlp
+async def search_query(query: str):
+    clean_query = query.strip()
+    # Low-confidence queries hi YouTube tak jayengi
+    with STAGE_SECONDS.labels("local_search").time():
+        hit = await local_search(clean_query)
+    if hit:
+        await remember_query(clean_query, *hit)
+        return hit
+
+    video_id, title, duration, thumbnail = await get_metadata(query)
+    if video_id:
+        await remember_query(clean_query, video_id, title, duration, thumbnail)
+    return video_id, title, duration, thumbnail
+
+# 🔎 Query -> (video_id, title, duration, thumbnail). Busy pool pe PoolBusy.
+async def resolve_query(query: str):
+    hit = await quick_resolve(query)
+    if hit: return hit
+    return await search_query(query)
+
+# ─────────────────────────────
+# 🔥 MAIN LOGIC
+# ─────────────────────────────
+async def process_request(query: str, key: str, type: str, mode: str = "sync"):
+    start_time = time.time()
+
+    # 1. Limit Check
+    with STAGE_SECONDS.labels("key_check").time():
+        is_allowed, error_msg = await check_api_limit(key)
+    if not is_allowed:
+        return {"status": 403, "error": error_msg}
+
+    # ID Extraction
+    try:
+        with STAGE_SECONDS.labels("id_extraction").time():
+            video_id, title, duration, thumbnail = await resolve_query(query)
+    except PoolBusy:
+        UPSTREAM_ERRORS.labels("metadata", "pool_busy").inc()
+        return {"status": 503, "error": "Server Busy, Try Again"}
+    except PoolTimeout:
+        UPSTREAM_ERRORS.labels("metadata", "timeout").inc()
+        return {"status": 504, "error": "Search Timeout, Try Again"}
+
+    if not video_id: return {"status": 404, "error": "Not Found"}
+    record_hit(video_id, type)
+
+    # Cache Check
+    with STAGE_SECONDS.labels("cache_lookup").time():
+        existing = await videos_col.find_one({"yt_id": video_id}, track_projection(type))
+    stream_link = f"{BASE_URL}/stream/{video_id}?type={type}"
+
+    if existing:
+        file_id = existing.get("video_file_id") if type == "video" else existing.get("audio_file_id")
+        if file_id:
+            CACHE_REQUESTS.labels("hit", type).inc()
+            await increment_usage(key)
+            return cache_response(existing, title, duration, thumbnail, video_id, type, stream_link, start_time)
+
+    # Miss: burst me N callers -> 1 download + 1 upload
+    CACHE_REQUESTS.labels("miss", type).inc()
+    if type == "video" and PREFETCH and PREFETCH_COMPANION:
+        # Video maanga hai toh audio bhi jaldi aayega
+        schedule_prefetch(video_id, "audio")
+    priority = await key_priority(key)
+    job_factory = lambda: coordinated_fetch(video_id, type, title, duration, thumbnail, stream_link, priority)
+
+    if mode == "async":
+        job_id = await submit_job(key, video_id, type, stream_link, start_time, job_factory)
+        if not job_id: return {"status": 503, "error": "Job Queue Full, Try Again"}
+        return {
+            "status": 202,
+            "job_id": job_id,
+            "status_url": f"{BASE_URL}/jobs/{job_id}",
+            "id": video_id,
+            "type": type
+        }
+
+    result = await single_flight((video_id, type), job_factory)
+    if result["status"] == 503:
+        # Overload: fast 503, cache hits ki latency bachi rahe
+        return JSONResponse(content=result, status_code=503, headers={"Retry-After": str(result.get("retry_after", MISS_RETRY_AFTER))})
+    if result["status"] != 200: return result
+
+    await increment_usage(key)
+
+    return new_upload_response(result, video_id, type, stream_link, start_time)
+
+# 📦 BATCH (NDJSON stream, jo ready ho pehle wahi bhejo)
+async def batch_stream(queries, key: str, type: str):
+    start_time = time.time()
+    track_field = file_field(type)
+    sem = asyncio.Semaphore(BATCH_CONCURRENCY)
+    served = 0
+    priority = await key_priority(key)
+
+    def line(i, q, payload):
+        return json.dumps({"index": i, "query": q, **payload}, ensure_ascii=False) + "\n"
+
+    def serve(i, q, meta, existing):
+        # Hit -> turant response; miss -> None (download pipeline me jayega)
+        nonlocal served
+        video_id, title, duration, thumbnail = meta
+        record_hit(video_id, type)
+        if existing and existing.get(track_field):
+            CACHE_REQUESTS.labels("hit", type).inc()
+            served += 1
+            stream_link = f"{BASE_URL}/stream/{video_id}?type={type}"
+            return cache_response(existing, title, duration, thumbnail, video_id, type, stream_link, start_time)
+        CACHE_REQUESTS.labels("miss", type).inc()
+        return None
+
+    async def fill_miss(i, q, video_id, title, duration, thumbnail):
+        stream_link = f"{BASE_URL}/stream/{video_id}?type={type}"
+        async with sem:
+            result = await single_flight(
+                (video_id, type),
+                lambda: coordinated_fetch(video_id, type, title, duration, thumbnail, stream_link, priority)
+            )
+        if result["status"] == 200:
+            result = new_upload_response(result, video_id, type, stream_link, start_time)
+        return i, q, result
+
+    async def searched(i, q):
+        # Search wali query: resolve hote hi apna cache lookup, hit ho toh wahi bhej do
+        async with sem:
+            try:
+                meta = await search_query(q)
+            except PoolBusy:
+                return i, q, {"status": 503, "error": "Server Busy, Try Again"}
+            except PoolTimeout:
+                return i, q, {"status": 504, "error": "Search Timeout, Try Again"}
+        if not meta[0]:
+            return i, q, {"status": 404, "error": "Not Found"}
+        existing = await videos_col.find_one({"yt_id": meta[0]}, track_projection(type))
+        hit = serve(i, q, meta, existing)
+        if hit: return i, q, hit
+        return await fill_miss(i, q, *meta)
+
+    pending = set()
+    try:
+        # 1. Sasti tiers (id / query cache) sab ke liye ek saath
+        quick = await asyncio.gather(*(quick_resolve(q) for q in queries))
+
+        # Search wali queries abhi se background me chalu
+        pending = {asyncio.ensure_future(searched(i, q)) for i, (q, meta) in enumerate(zip(queries, quick)) if not meta}
+
+        # 2. Quick ids ka ek hi $in lookup, hits turant bhejo
+        ids = list({meta[0] for meta in quick if meta})
+        docs = {}
+        if ids:
+            async for doc in videos_col.find({"yt_id": {"$in": ids}}, track_projection(type)):
+                docs[doc["yt_id"]] = doc
+
+        misses = []
+        for i, (q, meta) in enumerate(zip(queries, quick)):
+            if not meta: continue
+            hit = serve(i, q, meta, docs.get(meta[0]))
+            if hit: yield line(i, q, hit)
+            else: misses.append((i, q, meta))
+
+        # Bina title wale misses ka metadata ek hi videos.list call me
+        untitled = [m[2][0] for m in misses if not m[2][1]]
+        info = await yt_search.videos(untitled) if untitled and yt_search.enabled else {}
+        pending |= {
+            asyncio.ensure_future(fill_miss(i, q, meta[0], *(info.get(meta[0]) or meta[1:])))
+            for i, q, meta in misses
+        }
+
+        # 3. Searches aur downloads, jo pehle khatam wahi pehle
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                i, q, result = task.result()
+                if result["status"] == 200 and result.get("source") != "cache": served += 1
+                yield line(i, q, result)
+    finally:
+        # Client chala gaya toh bache searches cancel (downloads single_flight me shielded hain)
+        for task in pending: task.cancel()
+        # Poore batch ka quota ek hi baar
+        if served: await increment_usage(key, served)
+
 # ─────────────────────────────
 # 🚀 ENDPOINTS
 # ─────────────────────────────
@@ -301,23 +1721,39 @@ async def home():
 
 # 2️⃣ AUDIO
 @app.get("/getaudio")
-async def get_audio_endpoint(query: str, key: str):
-    return await process_request(query, key, "audio")
+async def get_audio_endpoint(query: str, key: str, mode: str = "sync"):
+    return await process_request(query, key, "audio", mode)
 
 # 3️⃣ VIDEO
 @app.get("/getvideo")
-async def get_video_endpoint(query: str, key: str):
-    return await process_request(query, key, "video")
+async def get_video_endpoint(query: str, key: str, mode: str = "sync"):
+    return await process_request(query, key, "video", mode)
+
+# 📦 BATCH RESOLVE (NDJSON)
+@app.post("/batch")
+async def batch_endpoint(key: str, type: str = "audio", queries: list = Body(..., embed=True)):
+    if type not in ("audio", "video"):
+        return JSONResponse(content={"status": 400, "error": "type must be audio or video"}, status_code=400)
+    queries = [str(q) for q in queries if str(q).strip()]
+    if not queries or len(queries) > BATCH_MAX:
+        return JSONResponse(content={"status": 400, "error": f"Send 1-{BATCH_MAX} queries"}, status_code=400)
+
+    is_allowed, error_msg = await check_api_limit(key, cost=len(queries))
+    if not is_allowed:
+        return JSONResponse(content={"status": 403, "error": error_msg}, status_code=403)
+
+    return StreamingResponse(batch_stream(queries, key, type), media_type="application/x-ndjson")
 
 # 4️⃣ STATS
 @app.get("/stats")
 async def get_stats(key: str):
-    user = await keys_col.find_one({"api_key": key})
+    user = await get_key_doc(key)
     if not user:
         return JSONResponse(content={"error": "Invalid API Key"}, status_code=403)
     
     daily_limit = user.get("daily_limit", 100)
-    used_today = user.get("used_today", 0)
+    roll_usage_day()
+    used_today = user.get("used_today", 0) + pending_usage.get(key, 0)
     
     return {
         "status": 200,
@@ -326,40 +1762,235 @@ async def get_stats(key: str):
         "daily_limit": daily_limit,
         "used_today": used_today,
         "remaining": daily_limit - used_today,
-        "total_usage": user.get("total_usage", 0)
+        "total_usage": user.get("total_usage", 0) + pending_usage.get(key, 0)
     }
 
-# 5️⃣ STREAM REDIRECT (Direct API - 100% Works)
-@app.get("/stream/{yt_id}")
-async def stream_redirect(yt_id: str, type: str = "audio"):
-    doc = await videos_col.find_one({"yt_id": yt_id})
+# 📡 STREAM URL RESOLVE -> (telegram_file_url, None) ya (None, error_response)
+async def resolve_stream_url(yt_id: str, type: str):
+    cache_key = (yt_id, type)
+    cached = stream_cache.get(cache_key)
+    if cached is not MISS:
+        if cached is None:
+            return None, RedirectResponse("https://http.cat/404")
+        return cached, None
+
+    doc = await videos_col.find_one({"yt_id": yt_id}, {"_id": 0, file_field(type): 1, f"{type}_bot_id": 1})
     if not doc:
-        return RedirectResponse("https://http.cat/404")
+        stream_cache.set(cache_key, None, ttl=STREAM_NEGATIVE_TTL)
+        return None, RedirectResponse("https://http.cat/404")
     
     target_file_id = doc.get("video_file_id") if type == "video" else doc.get("audio_file_id")
     if not target_file_id:
-        return RedirectResponse("https://http.cat/404")
+        stream_cache.set(cache_key, None, ttl=STREAM_NEGATIVE_TTL)
+        return None, RedirectResponse("https://http.cat/404")
     
+    # file_id sirf usi bot ke saath chalta hai jisne upload kiya
+    tg = bot_pool.get(doc.get(f"{type}_bot_id"))
+
     try:
-        async with aiohttp.ClientSession() as session:
-            # Seedha Telegram Server se Link maango
-            api_url = f"https://api.telegram.org/bot{BOT_TOKEN}/getFile?file_id={target_file_id}"
-            
-            async with session.get(api_url) as resp:
+        # Seedha Telegram Server se Link maango
+        api_url = f"{TELEGRAM_API_URL}/bot{tg.token}/getFile?file_id={target_file_id}"
+        
+        for attempt in range(2):
+            wait = tg.flood_wait()
+            if wait > BOT_MAX_FLOOD_WAIT:
+                return None, JSONResponse(
+                    content={"status": 429, "error": "Telegram FloodWait, Try Again"},
+                    status_code=429, headers={"Retry-After": str(int(wait) + 1)}
+                )
+            if wait: await asyncio.sleep(wait)
+            async with get_http().get(api_url, timeout=aiohttp.ClientTimeout(total=HTTP_TELEGRAM_TIMEOUT)) as resp:
                 data = await resp.json()
-                
-                if not data.get("ok"):
-                    print(f"❌ Telegram API Error: {data}")
-                    return JSONResponse(content=data, status_code=400)
-                
-                file_path = data["result"]["file_path"]
-                fresh_link = f"https://api.telegram.org/file/bot{BOT_TOKEN}/{file_path}"
-                
-                return RedirectResponse(url=fresh_link)
+
+            retry_after = data.get("parameters", {}).get("retry_after")
+            if retry_after:
+                UPSTREAM_ERRORS.labels("telegram_getfile", "flood_wait").inc()
+                tg.flood(retry_after)
+                if attempt == 0 and retry_after <= BOT_MAX_FLOOD_WAIT: continue
+                return None, JSONResponse(content=data, status_code=429, headers={"Retry-After": str(retry_after)})
+            break
+        
+        if not data.get("ok"):
+            print(f"❌ Telegram API Error: {data}")
+            UPSTREAM_ERRORS.labels("telegram_getfile", f"error_{data.get('error_code')}").inc()
+            return None, JSONResponse(content=data, status_code=400)
+        
+        file_path = data["result"]["file_path"]
+        fresh_link = f"{TELEGRAM_API_URL}/file/bot{tg.token}/{file_path}"
+        stream_cache.set(cache_key, fresh_link)
+        
+        return fresh_link, None
 
     except Exception as e:
         print(f"❌ Stream Server Error: {e}")
-        return RedirectResponse("https://http.cat/500")
+        UPSTREAM_ERRORS.labels("telegram_getfile", e.__class__.__name__).inc()
+        return None, RedirectResponse("https://http.cat/500")
+
+# 💽 PROXY MODE
+disk_cache = DiskCache(STREAM_DISK_DIR, STREAM_DISK_MAX)
+disk_fills = {}  # name -> background fill task
+
+def stream_media_type(type: str):
+    return "video/mp4" if type == "video" else "audio/mpeg"
+
+async def fill_disk_cache(name: str, url: str):
+    # Poori file background me disk pe (seek wale requests ke baad)
+    tmp = disk_cache.tmp_path(name)
+    try:
+        async with get_http().get(url, timeout=aiohttp.ClientTimeout(total=HTTP_DOWNLOAD_TIMEOUT)) as resp:
+            if resp.status != 200: return
+            with open(tmp, "wb") as f:
+                async for chunk in resp.content.iter_chunked(DOWNLOAD_CHUNK):
+                    await asyncio.to_thread(f.write, chunk)
+        await asyncio.to_thread(disk_cache.commit, name, tmp)
+    except Exception as e:
+        print(f"⚠️ Disk cache fill error: {e}")
+    finally:
+        if os.path.exists(tmp): os.remove(tmp)
+        disk_fills.pop(name, None)
+
+async def proxy_stream(name: str, url: str, type: str, range_header: str):
+    headers = {"Range": range_header} if range_header else {}
+    try:
+        resp = await get_http().get(url, headers=headers, timeout=aiohttp.ClientTimeout(total=HTTP_DOWNLOAD_TIMEOUT))
+    except Exception as e:
+        print(f"❌ Stream Proxy Error: {e}")
+        UPSTREAM_ERRORS.labels("telegram_file", e.__class__.__name__).inc()
+        return JSONResponse(content={"status": 502, "error": "Stream Failed"}, status_code=502)
+    if resp.status not in (200, 206):
+        resp.release()
+        UPSTREAM_ERRORS.labels("telegram_file", f"http_{resp.status}").inc()
+        return JSONResponse(content={"status": resp.status, "error": "Stream Failed"}, status_code=502)
+
+    # Full-file request + koi aur fill nahi chal raha -> client ko bhejte-bhejte disk bharo
+    fill = resp.status == 200 and name not in disk_fills
+    if fill:
+        STREAM_PROXY_REQUESTS.labels("fill").inc()
+        disk_fills[name] = None
+    else:
+        STREAM_PROXY_REQUESTS.labels("passthrough").inc()
+        if name not in disk_fills:
+            disk_fills[name] = asyncio.create_task(fill_disk_cache(name, url))
+
+    async def body():
+        tmp = disk_cache.tmp_path(name) if fill else None
+        f = await asyncio.to_thread(open, tmp, "wb") if fill else None
+        complete = False
+        try:
+            async for chunk in resp.content.iter_chunked(DOWNLOAD_CHUNK):
+                if f: await asyncio.to_thread(f.write, chunk)
+                yield chunk
+            complete = True
+        finally:
+            resp.release()
+            if f:
+                await asyncio.to_thread(f.close)
+                if complete: await asyncio.to_thread(disk_cache.commit, name, tmp)
+                if os.path.exists(tmp): os.remove(tmp)
+                disk_fills.pop(name, None)
+
+    out_headers = {"Accept-Ranges": "bytes"}
+    for h in ("Content-Length", "Content-Range"):
+        if h in resp.headers: out_headers[h] = resp.headers[h]
+    return StreamingResponse(body(), status_code=resp.status, headers=out_headers, media_type=stream_media_type(type))
+
+# 5️⃣ STREAM REDIRECT (Direct API - 100% Works) / PROXY
+@app.get("/stream/{yt_id}")
+async def stream_redirect(yt_id: str, request: Request, type: str = "audio", proxy: bool = True):
+    # type / yt_id file name banate hain: sirf known values ("../" wala path bahar na jaye)
+    if type not in ("audio", "video"):
+        return JSONResponse(content={"status": 400, "error": "type must be audio or video"}, status_code=400)
+    if not VIDEO_ID.fullmatch(yt_id):
+        return JSONResponse(content={"status": 400, "error": "Invalid video id"}, status_code=400)
+    # Proxy/disk cache operator ka faisla (STREAM_PROXY); client sirf ?proxy=0 se redirect maang sakta hai
+    use_proxy = STREAM_PROXY and proxy
+    name = f"{type}_{yt_id}"
+
+    # Disk hit: koi upstream call nahi
+    if use_proxy:
+        path = disk_cache.get(name)
+        if path:
+            try:
+                response = RangeFileResponse(path, stream_media_type(type), request.headers.get("range"))
+                STREAM_PROXY_REQUESTS.labels("disk_hit").inc()
+                return response
+            except FileNotFoundError:
+                # get() aur open ke beech dusre worker ne evict kar di; upstream se proxy karo
+                pass
+
+    url, error = await resolve_stream_url(yt_id, type)
+    if error: return error
+
+    if use_proxy:
+        return await proxy_stream(name, url, type, request.headers.get("range"))
+    return RedirectResponse(url=url)
+
+# 6️⃣ KEY CACHE INVALIDATE (bot.py admin commands ke liye)
+@app.post("/admin/invalidate")
+async def invalidate_key(user_id: int, x_admin_token: str = Header("")):
+    if not ADMIN_TOKEN or x_admin_token != ADMIN_TOKEN:
+        return JSONResponse(content={"error": "Forbidden"}, status_code=403)
+    # Baaki workers/nodes agle flush round (USAGE_FLUSH_INTERVAL) me drop karenge
+    await invalidations_col.insert_one({"user_id": user_id, "at": datetime.datetime.utcnow(), "by": NODE_ID})
+    return {"status": 200, "dropped": invalidate_user_keys(user_id)}
+
+# 7️⃣ ASYNC JOB STATUS
+@app.get("/jobs/{job_id}")
+async def job_status(job_id: str):
+    job = jobs.get(job_id)
+    if job is MISS:
+        # Shayad kisi aur worker ne job liya tha
+        job = await jobs_col.find_one({"_id": job_id}, {"state": 1, "result": 1})
+        if not job:
+            return JSONResponse(content={"status": 404, "error": "Job Not Found"}, status_code=404)
+        return {"status": 200, "job_id": job_id, "state": job["state"], "stage": job["state"], "result": job["result"]}
+
+    stage = job["state"]
+    if stage == "running":
+        stage = miss_stages.get((job["video_id"], job["type"]), stage)
+
+    return {
+        "status": 200,
+        "job_id": job_id,
+        "state": job["state"],
+        "stage": stage,
+        "result": job["result"]
+    }
+
+# 8️⃣ PROMETHEUS METRICS
+@app.get("/metrics")
+async def metrics():
+    if PROMETHEUS_MULTIPROC_DIR:
+        # Saare uvicorn workers ka combined view
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return Response(content=generate_latest(registry), media_type=CONTENT_TYPE_LATEST)
+    return Response(content=generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
+# 9️⃣ BULK WARM-UP (admin: ids/links list -> background prefetch)
+@app.post("/admin/warmup")
+async def warmup(x_admin_token: str = Header(""), type: str = "audio", ids: list = Body(..., embed=True)):
+    if not ADMIN_TOKEN or x_admin_token != ADMIN_TOKEN:
+        return JSONResponse(content={"error": "Forbidden"}, status_code=403)
+    if type not in ("audio", "video"):
+        return JSONResponse(content={"status": 400, "error": "type must be audio or video"}, status_code=400)
+    if not PREFETCH:
+        return JSONResponse(content={"status": 503, "error": "Prefetch disabled (PREFETCH=0)"}, status_code=503)
+
+    queued, skipped = 0, []
+    for raw in ids:
+        video_id = extract_video_id(str(raw))
+        if video_id and schedule_prefetch(video_id, type): queued += 1
+        else: skipped.append(raw)
+    return {"status": 200, "queued": queued, "skipped": skipped, "pending": prefetch_queue.qsize()}
+
+# 🔟 READINESS (liveness "/" pe; yahan warm-up poora hua ya nahi)
+@app.get("/ready")
+async def ready():
+    pending = [name for name, done in readiness.items() if not done]
+    if pending:
+        return JSONResponse(content={"status": 503, "ready": False, "pending": pending}, status_code=503)
+    return {"status": 200, "ready": True, "warmup_time": f"{app.state.warmup_seconds:.2f}s"}
 
 if __name__ == "__main__":
     import uvicorn
@@ -0,0 +1,143 @@
+import os
+import uuid
+import asyncio
+from starlette.responses import Response
+
+# ─────────────────────────────
+# RANGE HELPERS
+# ─────────────────────────────
+def parse_range(header: str, size: int):
+    # Sirf single range: "bytes=0-99", "bytes=100-", "bytes=-500"
+    # Return: None (poori file), (start, end) inclusive, ya "invalid" (416)
+    if not header or not header.startswith("bytes=") or "," in header:
+        return None
+    start_s, _, end_s = header[6:].strip().partition("-")
+    try:
+        if not start_s:
+            length = int(end_s)
+            if length <= 0: return "invalid"
+            return max(0, size - length), size - 1
+        start = int(start_s)
+        end = int(end_s) if end_s else size - 1
+    except ValueError:
+        return None
+    if start >= size or end < start: return "invalid"
+    return start, min(end, size - 1)
+
+# ─────────────────────────────
+# 📁 FILE RESPONSE (Range + zero-copy)
+# ─────────────────────────────
+class RangeFileResponse(Response):
+    # Server "http.response.zerocopysend" extension de toh kernel sendfile,
+    # warna thread me pread chunks (event loop block nahi hota)
+    chunk_size = 256 * 1024
+
+    def __init__(self, path: str, media_type: str, range_header: str = None):
+        self.path = path
+        self.fd = os.open(path, os.O_RDONLY)  # evict/unlink ho jaye toh bhi fd valid
+        size = os.fstat(self.fd).st_size
+        rng = parse_range(range_header, size)
+
+        headers = {"Accept-Ranges": "bytes"}
+        if rng == "invalid":
+            os.close(self.fd)
+            self.fd = None
+            headers["Content-Range"] = f"bytes */{size}"
+            super().__init__(status_code=416, headers=headers)
+            return
+
+        if rng is None:
+            self.offset, self.count, status = 0, size, 200
+        else:
+            start, end = rng
+            self.offset, self.count, status = start, end - start + 1, 206
+            headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+        headers["Content-Length"] = str(self.count)
+        super().__init__(status_code=status, headers=headers, media_type=media_type)
+
+    async def __call__(self, scope, receive, send):
+        if self.fd is None:
+            return await super().__call__(scope, receive, send)
+
+        try:
+            await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+            if scope.get("method") == "HEAD":
+                await send({"type": "http.response.body", "body": b""})
+                return
+
+            if "http.response.zerocopysend" in scope.get("extensions", {}):
+                await send({"type": "http.response.zerocopysend", "file": self.fd, "offset": self.offset, "count": self.count})
+                return
+
+            offset, remaining = self.offset, self.count
+            while remaining > 0:
+                chunk = await asyncio.to_thread(os.pread, self.fd, min(self.chunk_size, remaining), offset)
+                if not chunk: break
+                offset += len(chunk)
+                remaining -= len(chunk)
+                await send({"type": "http.response.body", "body": chunk, "more_body": remaining > 0})
+            if remaining > 0:
+                await send({"type": "http.response.body", "body": b""})
+        finally:
+            os.close(self.fd)
+
+# ─────────────────────────────
+# 💽 HOT FILE DISK CACHE (size-bounded LRU)
+# ─────────────────────────────
+# Saare uvicorn workers ek hi directory share karte hain, isliye index disk hi hai:
+# kisi bhi worker ki bhari file har worker ke liye hit, LRU order mtime se (get() touch karta hai)
+class DiskCache:
+    def __init__(self, root: str, max_bytes: int):
+        self.root = root
+        self.max_bytes = max_bytes  # poori directory ka budget
+
+    def load(self):
+        # .part files kisi live worker ki fill ho sakti hain; purani wali maintenance reaper hatata hai
+        os.makedirs(self.root, exist_ok=True)
+        self.evict()
+
+    def path(self, name: str):
+        # Name sirf isi directory ki file ho ("../x" ya "a/b" nahi)
+        if not name or name != os.path.basename(name) or name in (".", ".."):
+            raise ValueError(f"bad cache name: {name!r}")
+        return os.path.join(self.root, name)
+
+    def get(self, name: str):
+        path = self.path(name)
+        try:
+            os.utime(path)  # LRU touch, baaki workers ke evict() ko bhi dikhega
+        except FileNotFoundError:
+            return None
+        return path
+
+    def tmp_path(self, name: str):
+        return f"{self.path(name)}.{uuid.uuid4().hex[:8]}.part"
+
+    def commit(self, name: str, tmp: str):
+        # Directory scan karta hai: event loop se thread me bulao
+        size = os.path.getsize(tmp)
+        if size > self.max_bytes:
+            os.remove(tmp)
+            return
+        os.replace(tmp, self.path(name))
+        os.utime(self.path(name))
+        self.evict()
+
+    def evict(self):
+        # Saare workers ki files gin ke sabse purani (mtime) pehle hatao
+        files, total = [], 0
+        for entry in os.scandir(self.root):
+            if entry.name.endswith(".part"): continue
+            try:
+                st = entry.stat()
+            except FileNotFoundError:
+                continue
+            files.append((st.st_mtime, entry.name, st.st_size))
+            total += st.st_size
+        for _, name, size in sorted(files):
+            if total <= self.max_bytes: break
+            try:
+                os.remove(os.path.join(self.root, name))
+            except FileNotFoundError:
+                pass
+            total -= size
@@ -0,0 +1,214 @@
+import os
+import re
+import time
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+# ─────────────────────────────
+# HELPERS (main.py bhi yahi use karta hai)
+# ─────────────────────────────
+def extract_video_id(q: str):
+    if not q: return None
+    q = q.strip()
+    if len(q) == 11 and re.match(r'^[a-zA-Z0-9_-]{11}$', q): return q
+    patterns = [r'(?:v=|\/)([0-9A-Za-z_-]{11})', r'youtu\.be\/([0-9A-Za-z_-]{11})']
+    for pattern in patterns:
+        match = re.search(pattern, q)
+        if match: return match.group(1)
+    return None
+
+def format_time(seconds):
+    try: return f"{int(seconds)//60}:{int(seconds)%60:02d}"
+    except: return "0:00"
+
+YDL_OPTS = {
+    'quiet': True, 'skip_download': True, 'extract_flat': True, 'noplaylist': True,
+    'extractor_args': {'youtube': {'player_client': ['android', 'web']}}
+}
+
+# ─────────────────────────────
+# WORKER (har process me ek warm YoutubeDL)
+# ─────────────────────────────
+_ydl = None
+
+# yt_dlp import bhaari hai: pehli zarurat pe hi load (cold start fast)
+def init_worker():
+    global _ydl
+    import yt_dlp
+    _ydl = yt_dlp.YoutubeDL(YDL_OPTS)
+
+# 🔥 METADATA
+def get_video_metadata(query: str):
+    import yt_dlp
+    ydl = _ydl or yt_dlp.YoutubeDL(YDL_OPTS)
+    try:
+        direct_id = extract_video_id(query)
+        if direct_id:
+            info = ydl.extract_info(f"https://www.youtube.com/watch?v={direct_id}", download=False)
+            thumb = info.get('thumbnail') or f"https://i.ytimg.com/vi/{direct_id}/hqdefault.jpg"
+            return direct_id, info.get('title'), format_time(info.get('duration')), thumb
+        else:
+            info = ydl.extract_info(f"ytsearch1:{query}", download=False)
+            if info and 'entries' in info and info['entries']:
+                v = info['entries'][0]
+                vid_id = v['id']
+                thumb = v.get('thumbnail') or f"https://i.ytimg.com/vi/{vid_id}/hqdefault.jpg"
+                return vid_id, v['title'], format_time(v.get('duration')), thumb
+    except Exception as e:
+        print(f"Metadata Error: {e}")
+    return None, None, None, None
+
+# ─────────────────────────────
+# POOL
+# ─────────────────────────────
+class PoolBusy(Exception):
+    pass
+
+class PoolTimeout(Exception):
+    pass
+
+def ping():
+    # Prime ke liye: worker spawn + init_worker (yt_dlp import) abhi ho jaye
+    time.sleep(0.05)
+    return os.getpid()
+
+class MetadataPool:
+    def __init__(self, workers: int, max_queue: int, timeout: float, max_jobs: int):
+        self.workers = workers
+        self.timeout = timeout
+        self.max_jobs = max_jobs
+        self.executor = None
+        # Running + waiting jobs ka upper bound
+        self.slots = asyncio.Semaphore(workers + max_queue)
+
+    def start(self):
+        if self.workers <= 0: return
+        # spawn: fork ke saath max_tasks_per_child allowed nahi hai
+        self.executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=init_worker,
+            max_tasks_per_child=self.max_jobs or None
+        )
+
+    async def prime(self):
+        # Workers pehli search se pehle hi spawn + warm (startup pe background me)
+        if not self.executor: return
+        loop = asyncio.get_running_loop()
+        pids = await asyncio.gather(*(loop.run_in_executor(self.executor, ping) for _ in range(self.workers)))
+        return len(set(pids))
+
+    def stop(self):
+        if self.executor:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
+
+    async def extract(self, query: str):
+        # Workers=0 -> purana thread wala raasta
+        if self.workers <= 0:
+            return await asyncio.to_thread(get_video_metadata, query)
+
+        if self.slots.locked():
+            raise PoolBusy()
+        await self.slots.acquire()
+
+        loop = asyncio.get_running_loop()
+        try:
+            fut = loop.run_in_executor(self.executor, get_video_metadata, query)
+        except (BrokenProcessPool, RuntimeError):
+            self.slots.release()
+            self.stop()
+            self.start()
+            raise PoolBusy()
+
+        # Slot tabhi free hoga jab worker sach me free ho (timeout ke baad bhi)
+        fut.add_done_callback(lambda _: self.slots.release())
+        # Timeout/broken pool "Not Found" nahi hai: caller 504/503 dega
+        try:
+            return await asyncio.wait_for(asyncio.shield(fut), self.timeout)
+        except asyncio.TimeoutError:
+            print(f"⏱ Metadata Timeout: {query}")
+            raise PoolTimeout()
+        except BrokenProcessPool:
+            print("⚠️ Metadata pool broken, restarting...")
+            self.stop()
+            self.start()
+            raise PoolBusy()
+
+# ─────────────────────────────
+# LOCAL DOWNLOAD (external API slow/down ho toh fallback)
+# ─────────────────────────────
+def cancel_path(out_base: str):
+    # Process ke beech cancel signal: main process ye file bana de toh download ruk jata hai
+    return f"{out_base}.cancel"
+
+def download_local(video_id: str, type: str, out_base: str):
+    # Download pool ke process me chalta hai; cancel file dikhte hi progress hook abort karta hai
+    import yt_dlp
+    cancel_file = cancel_path(out_base)
+
+    def hook(_):
+        if os.path.exists(cancel_file):
+            raise yt_dlp.utils.DownloadCancelled()
+
+    opts = {
+        'quiet': True, 'noplaylist': True, 'outtmpl': f"{out_base}.%(ext)s",
+        'progress_hooks': [hook],
+        'extractor_args': {'youtube': {'player_client': ['android', 'web']}}
+    }
+    if type == "video":
+        opts['format'] = 'best[ext=mp4][height<=720]/best[ext=mp4]/best'
+    else:
+        opts['format'] = 'bestaudio[ext=m4a]/bestaudio'
+        opts['postprocessors'] = [{'key': 'FFmpegExtractAudio', 'preferredcodec': 'mp3', 'preferredquality': '192'}]
+
+    final = f"{out_base}.{'mp4' if type == 'video' else 'mp3'}"
+    try:
+        # Queue me rehte hi cancel ho gaya toh extraction bhi mat karo
+        if not os.path.exists(cancel_file):
+            with yt_dlp.YoutubeDL(opts) as ydl:
+                ydl.download([f"https://www.youtube.com/watch?v={video_id}"])
+            if os.path.exists(final) and not os.path.exists(cancel_file):
+                return final
+    except Exception as e:
+        if not os.path.exists(cancel_file):
+            print(f"❌ Local Download Error: {e}")
+    # Fail/cancel: adhoori files (aur cancel file) hatao
+    folder, prefix = os.path.split(out_base)
+    for name in os.listdir(folder):
+        if name.startswith(prefix):
+            try:
+                os.remove(os.path.join(folder, name))
+            except OSError:
+                pass
+    return None
+
+class DownloadPool:
+    # yt_dlp download (extraction + ffmpeg) API process ke GIL/event loop se bahar, chhota alag pool
+    def __init__(self, workers: int):
+        self.workers = workers
+        self.executor = None
+
+    def start(self):
+        if self.workers <= 0: return
+        self.executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"))
+
+    def stop(self):
+        if self.executor:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
+
+    async def download(self, video_id: str, type: str, out_base: str):
+        # Workers=0 -> purana thread wala raasta
+        if self.workers <= 0:
+            return await asyncio.to_thread(download_local, video_id, type, out_base)
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(self.executor, download_local, video_id, type, out_base)
+        except (BrokenProcessPool, RuntimeError) as e:
+            print(f"⚠️ Download pool broken, restarting... ({e!r})")
+            self.stop()
+            self.start()
+            return None
@@ -0,0 +1,124 @@
+import re
+import time
+import datetime
+import aiohttp
+from ytpool import extract_video_id, format_time
+
+YT_API_URL = "https://www.googleapis.com/youtube/v3"
+
+# YouTube Data API quota cost (units)
+SEARCH_COST = 100
+VIDEOS_COST = 1
+
+# Key hi kharab hai (invalid / disabled / API band): rotation se bahar, agli key try
+KEY_ERRORS = {"keyInvalid", "keyExpired", "accessNotConfigured", "forbidden", "ipRefererBlocked", "dailyLimitExceededUnreg"}
+
+def parse_iso_duration(value: str):
+    # "PT1H3M7S" -> 3787
+    m = re.match(r'^P(?:(\d+)D)?T?(?:(\d+)H)?(?:(\d+)M)?(?:(\d+)S)?$', value or "")
+    if not m: return 0
+    d, h, mi, s = (int(x or 0) for x in m.groups())
+    return ((d * 24 + h) * 60 + mi) * 60 + s
+
+def best_thumb(vid_id: str, thumbs: dict):
+    for size in ("high", "medium", "default"):
+        if thumbs.get(size, {}).get("url"): return thumbs[size]["url"]
+    return f"https://i.ytimg.com/vi/{vid_id}/hqdefault.jpg"
+
+# ─────────────────────────────
+# 🔑 API KEY POOL (round-robin + quota + cooldown)
+# ─────────────────────────────
+class YouTubeSearch:
+    def __init__(self, keys, get_http, daily_quota: int, cooldown: float, timeout: float):
+        self.keys = list(keys)
+        self.get_http = get_http
+        self.daily_quota = daily_quota
+        self.cooldown = cooldown
+        self.timeout = timeout
+        self.cursor = 0
+        self.used = {k: 0 for k in self.keys}
+        self.cool_until = {k: 0.0 for k in self.keys}
+        self.day = str(datetime.date.today())
+
+    @property
+    def enabled(self):
+        return bool(self.keys)
+
+    def next_key(self, cost: int):
+        today = str(datetime.date.today())
+        if today != self.day:
+            self.day = today
+            self.used = {k: 0 for k in self.keys}
+
+        now = time.monotonic()
+        for _ in range(len(self.keys)):
+            key = self.keys[self.cursor % len(self.keys)]
+            self.cursor += 1
+            if self.cool_until[key] > now: continue
+            if self.used[key] + cost > self.daily_quota: continue
+            return key
+        return None
+
+    async def call(self, endpoint: str, params: dict, cost: int):
+        # Har key try karo jab tak koi chal jaye; sab fail -> None (yt_dlp fallback)
+        for _ in range(len(self.keys)):
+            key = self.next_key(cost)
+            if not key: return None
+            self.used[key] += cost
+            try:
+                async with self.get_http().get(
+                    f"{YT_API_URL}/{endpoint}", params={**params, "key": key},
+                    timeout=aiohttp.ClientTimeout(total=self.timeout)
+                ) as resp:
+                    data = await resp.json()
+                    if resp.status == 200: return data
+
+                    error = data.get("error", {})
+                    reasons = {e.get("reason") for e in error.get("errors", [])}
+                    if reasons & {"quotaExceeded", "dailyLimitExceeded"}:
+                        # Quota khatam: din bhar ke liye side me
+                        self.used[key] = self.daily_quota
+                        self.cool_until[key] = time.monotonic() + self.cooldown
+                    elif reasons & {"rateLimitExceeded", "userRateLimitExceeded"} or resp.status >= 500:
+                        self.cool_until[key] = time.monotonic() + 60
+                    elif resp.status in (401, 403) or reasons & KEY_ERRORS or "API key" in str(error.get("message", "")):
+                        # Invalid key ke liye 400 badRequest "API key not valid" aata hai
+                        print(f"⚠️ YouTube API key disabled for {self.cooldown:.0f}s: {resp.status} {reasons}")
+                        self.cool_until[key] = time.monotonic() + self.cooldown
+                    else:
+                        # Request hi galat hai (invalidParameter / notFound): dusri key se bhi nahi chalega
+                        print(f"⚠️ YouTube API Error: {resp.status} {reasons}")
+                        return None
+            except Exception as e:
+                print(f"⚠️ YouTube API Error: {e}")
+                self.cool_until[key] = time.monotonic() + 60
+        return None
+
+    async def videos(self, ids):
+        # videos.list: ek call me 50 ids tak -> {id: (title, duration, thumb)}
+        out = {}
+        ids = list(dict.fromkeys(ids))
+        for i in range(0, len(ids), 50):
+            chunk = ids[i:i + 50]
+            data = await self.call("videos", {"part": "snippet,contentDetails", "id": ",".join(chunk), "maxResults": 50}, VIDEOS_COST)
+            if not data: break
+            for item in data.get("items", []):
+                snippet = item.get("snippet", {})
+                secs = parse_iso_duration(item.get("contentDetails", {}).get("duration"))
+                out[item["id"]] = (snippet.get("title"), format_time(secs), best_thumb(item["id"], snippet.get("thumbnails", {})))
+        return out
+
+    async def lookup(self, query: str):
+        # Same shape as get_video_metadata; None = fallback chahiye
+        if not self.enabled: return None
+
+        vid_id = extract_video_id(query)
+        if not vid_id:
+            data = await self.call("search", {"part": "id", "type": "video", "maxResults": 1, "q": query}, SEARCH_COST)
+            items = (data or {}).get("items") or []
+            if not items: return None
+            vid_id = items[0]["id"]["videoId"]
+
+        info = (await self.videos([vid_id])).get(vid_id)
+        if not info: return None
+        return (vid_id, *info)